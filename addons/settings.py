@@ -5,7 +5,19 @@ class Settings:
     def __init__(self, settings: dict) -> None:
         self.invite_link: str = "https://discord.com/invite/qGAzsX9PNj"
         self.nodes: dict = settings.get("nodes", {})
+        self.node_load_score: dict = settings.get("node_load_score", {})
+        self.rebalancer: dict = settings.get("rebalancer", {"enabled": False})
         self.max_queue: int = settings.get("default_max_queue", 1000)
+        self.queue_storage: str = settings.get("queue_storage", "list")
+        self.playlist_storage: str = settings.get("playlist_storage", "inline")
+        self.track_cache: dict = settings.get("track_cache", {})
+        self.decode_cache: dict = settings.get("decode_cache", {})
+        self.spotify_cache: dict = settings.get("spotify_cache", {"path": "spotify_cache.db"})
+        self.history_buffer: dict = settings.get("history_buffer", {})
+        self.settings_buffer: dict = settings.get("settings_buffer", {})
+        self.users_buffer: dict = settings.get("users_buffer", {})
+        self.write_queue: dict = settings.get("write_queue", {"enabled": False})
+        self.change_stream: dict = settings.get("change_stream", {"enabled": False})
         self.bot_prefix: str = settings.get("prefix", "")
         self.activity: dict = settings.get("activity", [{"listen": "/help"}])
         self.embed_color: str = int(settings.get("embed_color", "0xb3b3b3"), 16)
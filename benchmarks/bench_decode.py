@@ -0,0 +1,56 @@
+"""Measures track blob decoding throughput of the stream decoder against `decode_many`
+and against warm lookups in the decode cache.
+
+Usage: python benchmarks/bench_decode.py [count ...]
+"""
+
+import base64
+import io
+import random
+import sys
+
+from common import measure, report
+
+from voicelink import Track, encode, decode_many, decode_cache
+from voicelink.formatter import MessageInput, TrackDecoder
+
+def make_blobs(count: int) -> list:
+    rand = random.Random(count)
+    return [
+        encode(Track(
+            track_id=None,
+            info={
+                "identifier": f"{rand.getrandbits(64):016x}",
+                "title": f"Track {i} " + "x" * rand.randint(0, 60),
+                "author": f"Artist {rand.randint(0, 500)}",
+                "uri": f"https://www.youtube.com/watch?v={i:011d}",
+                "artworkUrl": f"https://i.ytimg.com/vi/{i:011d}/hqdefault.jpg",
+                "sourceName": "youtube",
+                "length": rand.randint(60000, 600000)
+            },
+            requester=None
+        )) for i in range(count)
+    ]
+
+def run(count: int) -> list:
+    blobs = make_blobs(count)
+    decode_cache.configure(max_entries=count)
+
+    def stream():
+        return [TrackDecoder().decode(MessageInput(io.BytesIO(base64.b64decode(blob)))) for blob in blobs]
+
+    def cold():
+        decode_cache.clear()
+        decode_many(blobs)
+
+    results = [
+        ["stream decoder", measure(stream)],
+        ["decode_many (cold)", measure(cold)],
+        ["decode_many (cached)", measure(decode_many, blobs)]
+    ]
+    return [[name, count, f"{ms:.2f}", f"{count / ms * 1000:,.0f}"] for name, ms in results]
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000]
+    rows = [row for count in counts for row in run(count)]
+    report("Track decoding", rows, ["method", "blobs", "ms", "blobs/s"])
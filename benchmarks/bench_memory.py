@@ -0,0 +1,45 @@
+"""Measures the memory held by a queue of tracks under each storage engine.
+
+Usage: python benchmarks/bench_memory.py [size ...]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from common import report
+from bench_decode import make_blobs
+
+from voicelink import Queue, Track, decode, decode_cache
+from voicelink.storage import STORAGE_ENGINES
+
+class Requester:
+    """Stands in for a discord.Member, which is shared between all tracks it requested."""
+
+def held_memory(engine: str, blobs: list, requesters: list) -> int:
+    decode_cache.clear()
+    gc.collect()
+    tracemalloc.start()
+    queue = Queue(len(blobs) + 1, True, lambda key: key, STORAGE_ENGINES[engine])
+    for index, blob in enumerate(blobs):
+        queue.put(Track(track_id=blob, info=dict(decode(blob)), requester=requesters[index % len(requesters)]))
+
+    decode_cache.clear()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+def run(size: int) -> list:
+    blobs = make_blobs(size)
+    requesters = [Requester() for _ in range(20)]
+    rows = []
+    for engine in STORAGE_ENGINES:
+        held = held_memory(engine, blobs, requesters)
+        rows.append([engine, size, f"{held / 1024 / 1024:.2f}", f"{held / size:.0f}"])
+    return rows
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50000]
+    rows = [row for size in sizes for row in run(size)]
+    report("Queue memory", rows, ["engine", "tracks", "MiB", "bytes/track"])
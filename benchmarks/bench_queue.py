@@ -0,0 +1,68 @@
+"""Compares the queue storage engines on the operations the bot runs on large queues.
+
+Usage: python benchmarks/bench_queue.py [size ...]
+"""
+
+import random
+import sys
+
+from common import measure, report
+
+from voicelink import Queue, Track
+from voicelink.storage import STORAGE_ENGINES
+
+def make_tracks(size: int) -> list:
+    return [
+        Track(
+            track_id=None,
+            info={"identifier": str(i), "title": f"Track {i}", "author": "Bench", "uri": f"https://example.com/{i}", "sourceName": "http", "length": 1000},
+            requester=None
+        ) for i in range(size)
+    ]
+
+def build(engine, tracks: list) -> Queue:
+    queue = Queue(len(tracks) * 2, True, lambda key: key, STORAGE_ENGINES[engine])
+    for track in tracks:
+        queue.put(track)
+    return queue
+
+def run(size: int) -> list:
+    tracks = make_tracks(size)
+    extra = make_tracks(1000)
+    rand = random.Random(size)
+    positions = [(rand.randint(1, size // 2), rand.randint(1, size // 2)) for _ in range(1000)]
+    rows = []
+
+    for engine in STORAGE_ENGINES:
+        queue = build(engine, tracks)
+
+        def put_at_index():
+            for (index, _), track in zip(positions, extra):
+                queue.put_at_index(index, track)
+
+        def move():
+            for target, to in positions:
+                queue.move(target, to)
+
+        def remove():
+            for index, _ in positions:
+                queue.remove(index)
+
+        def count():
+            for _ in range(10000):
+                queue.count
+
+        rows.append([
+            engine, size,
+            f"{measure(build, engine, tracks, repeat=1):.2f}",
+            f"{measure(put_at_index, repeat=1):.2f}",
+            f"{measure(move, repeat=1):.2f}",
+            f"{measure(remove, repeat=1):.2f}",
+            f"{measure(count, repeat=1):.2f}"
+        ])
+    return rows
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000, 20000, 50000]
+    rows = [row for size in sizes for row in run(size)]
+    report("Queue storage (ms, 1000 ops each, count = 10k reads)", rows, ["engine", "size", "put", "insert", "move", "remove", "count"])
@@ -0,0 +1,49 @@
+"""Compares building eager Track objects against LazyTrack for a stored playlist,
+where only the first page of tracks is ever displayed.
+
+Usage: python benchmarks/bench_tracks.py [size ...]
+"""
+
+import sys
+import tracemalloc
+
+from common import measure, report
+from bench_decode import make_blobs
+
+from voicelink import Track, LazyTrack, decode, decode_cache
+
+def eager(blobs: list) -> list:
+    return [Track(track_id=blob, info=decode(blob), requester=None) for blob in blobs]
+
+def lazy(blobs: list) -> list:
+    return [LazyTrack(track_id=blob, requester=None) for blob in blobs]
+
+def first_page(tracks: list) -> None:
+    for track in tracks[:7]:
+        track.title, track.emoji, track.thumbnail
+
+def memory(builder, blobs: list) -> int:
+    decode_cache.clear()
+    tracemalloc.start()
+    tracks = builder(blobs)
+    first_page(tracks)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+def run(size: int) -> list:
+    blobs = make_blobs(size)
+    decode_cache.configure(max_entries=size)
+    rows = []
+    for name, builder in (("Track", eager), ("LazyTrack", lazy)):
+        def load():
+            decode_cache.clear()
+            first_page(builder(blobs))
+
+        rows.append([name, size, f"{measure(load):.2f}", f"{memory(builder, blobs) / 1024:,.0f}"])
+    return rows
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000]
+    rows = [row for size in sizes for row in run(size)]
+    report("Playlist load (first page displayed)", rows, ["class", "tracks", "ms", "KiB"])
@@ -0,0 +1,65 @@
+"""Measures the latency of the playlist autocomplete read path for a user with
+large playlists, copying the document against reading it through a view.
+
+The user document is placed in USERS_BUFFER, so no database is needed.
+
+Usage: python benchmarks/bench_user_reads.py [playlists] [tracks]
+"""
+
+import asyncio
+import copy
+import sys
+import time
+
+from common import report
+from bench_decode import make_blobs
+
+import function as func
+
+USER_ID = 1
+
+def make_user(playlists: int, tracks: int) -> dict:
+    blobs = make_blobs(tracks)
+    user = {"_id": USER_ID, **copy.deepcopy(func.USERS_BASE)}
+    for index in range(playlists):
+        user["playlist"][str(200 + index)] = {
+            "name": f"Playlist {index}",
+            "type": "playlist",
+            "tracks": list(blobs),
+            "perms": {"read": [], "write": [], "remove": []}
+        }
+    return user
+
+async def autocomplete(current: str, **kwargs) -> list:
+    # Same work as Playlists.playlist_autocomplete
+    playlists_raw = await func.get_user(USER_ID, "playlist", **kwargs)
+    playlists = [value["name"] for value in playlists_raw.values()] if playlists_raw else []
+    return [p for p in playlists if current in p]
+
+async def measure(repeat: int, **kwargs) -> list:
+    timings = []
+    for index in range(repeat):
+        start = time.perf_counter()
+        await autocomplete(str(index % 10), **kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)
+
+async def main(playlists: int, tracks: int) -> None:
+    func.USERS_BUFFER[USER_ID] = make_user(playlists, tracks)
+
+    rows = []
+    for name, kwargs, repeat in (("deepcopy", {}, 50), ("view", {"view": True}, 5000)):
+        timings = await measure(repeat, **kwargs)
+        rows.append([
+            name, f"{sum(timings) / len(timings):.4f}",
+            f"{timings[len(timings) // 2]:.4f}", f"{timings[int(len(timings) * 0.95)]:.4f}"
+        ])
+
+    report(f"Playlist autocomplete, {playlists} x {tracks} tracks", rows, ["read", "avg ms", "p50 ms", "p95 ms"])
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(
+        int(args[0]) if len(args) > 0 else 10,
+        int(args[1]) if len(args) > 1 else 500
+    ))
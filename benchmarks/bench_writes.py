@@ -0,0 +1,91 @@
+"""Compares writing settings/user updates one by one against the coalescing WriteQueue.
+
+MongoDB isn't needed: the collection below only counts requests and sleeps for a
+simulated round trip, which is what dominates the cost of update_one in production.
+
+Usage: python benchmarks/bench_writes.py [updates] [documents] [round_trip_ms]
+"""
+
+import asyncio
+import random
+import sys
+import time
+
+from common import report
+
+import function as func
+
+class SimulatedCollection:
+    name = "bench"
+
+    def __init__(self, round_trip: float) -> None:
+        self.round_trip: float = round_trip
+        self.round_trips: int = 0
+        self.operations: int = 0
+
+    async def update_one(self, filter: dict, data: dict):
+        self.round_trips += 1
+        self.operations += 1
+        await asyncio.sleep(self.round_trip)
+
+    async def bulk_write(self, requests: list, ordered: bool = True):
+        self.round_trips += 1
+        self.operations += len(requests)
+        await asyncio.sleep(self.round_trip)
+
+def make_updates(count: int, documents: int) -> list:
+    rng = random.Random(0)
+    updates = []
+    for _ in range(count):
+        user_id = rng.randrange(documents)
+        kind = rng.random()
+        if kind < 0.5:
+            data = {"$push": {"history": {"$each": [f"track-{rng.randrange(10_000)}"], "$slice": -25}}}
+        elif kind < 0.8:
+            data = {"$set": {"playlist.200.tracks": [rng.randrange(100)]}}
+        elif kind < 0.95:
+            data = {"$inc": {"plays": 1}}
+        else:
+            data = {"$unset": {"playlist.200.tracks": ""}}
+        updates.append(({"_id": user_id}, data))
+    return updates
+
+async def run_direct(updates: list, round_trip: float) -> tuple:
+    collection = SimulatedCollection(round_trip)
+    start = time.perf_counter()
+    for filter, data in updates:
+        await collection.update_one(filter, data)
+    return (time.perf_counter() - start) * 1000, collection, None
+
+async def run_queued(updates: list, round_trip: float) -> tuple:
+    collection = SimulatedCollection(round_trip)
+    queue = func.WriteQueue(collection, max_pending=len(updates) + 1)
+    start = time.perf_counter()
+    for filter, data in updates:
+        queue.put(filter, data)
+    await queue.flush()
+    return (time.perf_counter() - start) * 1000, collection, queue
+
+async def main(count: int, documents: int, round_trip_ms: float) -> None:
+    updates = make_updates(count, documents)
+    rows = []
+    for name, runner in (("update_one", run_direct), ("WriteQueue", run_queued)):
+        elapsed, collection, queue = await runner(updates, round_trip_ms / 1000)
+        stats = queue.stats if queue else {}
+        rows.append([
+            name, f"{elapsed:.1f}", collection.round_trips, collection.operations,
+            stats.get("merged", "-"), stats.get("conflicts", "-")
+        ])
+
+    report(
+        f"{count} updates over {documents} documents, {round_trip_ms}ms round trip",
+        rows, ["mode", "ms", "round trips", "operations", "merged", "conflicts"]
+    )
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(
+        int(args[0]) if len(args) > 0 else 10_000,
+        int(args[1]) if len(args) > 1 else 500,
+        float(args[2]) if len(args) > 2 else 0.5
+    ))
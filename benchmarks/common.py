@@ -0,0 +1,36 @@
+"""Shared helpers for the scripts in this folder.
+
+The benchmarks import the bot modules the same way main.py does, so they need
+a settings.json (and .env) in the project root, or a SETTINGS_FILE environment
+variable pointing at another settings file.
+"""
+
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import function as func
+from addons import Settings
+
+func.settings = Settings(func.open_json(func.SETTINGS_FILE))
+
+def measure(func, *args, repeat: int = 3, **kwargs) -> float:
+    """Returns the best wall time of `repeat` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def report(title: str, rows: list, headers: list) -> None:
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    print(f"\n{title}")
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(value).ljust(w) for value, w in zip(row, widths)))
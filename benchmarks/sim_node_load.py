@@ -0,0 +1,90 @@
+"""Simulates how players are spread over nodes with different capacities and
+conditions by fewest-players selection against the LoadScore of NodeAlgorithm.by_load.
+
+Every node has a synthetic CPU cost per player, a base latency and optionally
+frame loss once it gets busy. After each placement the node's stats are
+regenerated as Lavalink would report them.
+
+Usage: python benchmarks/sim_node_load.py [players]
+"""
+
+import sys
+import time
+
+from common import report
+
+from voicelink import LoadScore
+from voicelink.utils import NodeStats, ProbeStats
+
+MB = 1024 * 1024
+
+# name, cpu load per player, latency in ms, players after which frames start to drop, recent failures
+PROFILES = [
+    ("big", 0.002, 20, 400, 0),
+    ("small", 0.006, 20, 120, 0),
+    ("far", 0.002, 180, 400, 0),
+    ("flaky", 0.002, 20, 400, 2),
+]
+
+class Player:
+    is_playing = True
+
+class SimulatedNode:
+    def __init__(self, name: str, cpu_per_player: float, latency: float, frame_limit: int, failures: int) -> None:
+        self.name = name
+        self.cpu_per_player = cpu_per_player
+        self.frame_limit = frame_limit
+        self._players = {}
+        self._probe = ProbeStats()
+        self._probe.add(latency, latency * 2)
+        self._failure_penalty = 0.0
+        self._failure_at = 0.0
+        self._failures = failures
+        self.refresh()
+
+    def refresh(self) -> None:
+        players = len(self._players)
+        overload = max(0, players - self.frame_limit)
+        self._stats = NodeStats({
+            "memory": {"used": (200 + players * 2) * MB, "free": 800 * MB, "reservable": 2048 * MB, "allocated": 1024 * MB},
+            "cpu": {"cores": 4, "systemLoad": 0.1, "lavalinkLoad": min(1.0, 0.02 + players * self.cpu_per_player)},
+            "playingPlayers": players,
+            "players": players,
+            "uptime": 0,
+            "frameStats": {"sent": 3000, "nulled": overload * 5, "deficit": overload * 10},
+        })
+
+def simulate(total: int, pick) -> list:
+    nodes = [SimulatedNode(*profile) for profile in PROFILES]
+    score = LoadScore()
+    for node in nodes:
+        for _ in range(node._failures):
+            node._failure_penalty = score.failure_penalty(node) + score.failure
+            node._failure_at = time.monotonic()
+
+    for index in range(total):
+        node = pick(nodes, score)
+        node._players[index] = Player()
+        node.refresh()
+    return nodes
+
+def by_players(nodes: list, score: LoadScore):
+    return min(nodes, key=lambda node: len(node._players))
+
+def by_load(nodes: list, score: LoadScore):
+    return min(nodes, key=score.score)
+
+def main(total: int) -> None:
+    rows = []
+    for name, pick in (("by_players", by_players), ("by_load", by_load)):
+        for node in simulate(total, pick):
+            stats = node._stats
+            rows.append([
+                name, node.name, len(node._players), f"{stats.cpu_process_load * 100:.0f}%",
+                stats.frames_deficit, f"{node._probe.latency:.0f}"
+            ])
+
+    report(f"{total} players over {len(PROFILES)} nodes", rows, ["algorithm", "node", "players", "cpu", "frame deficit", "latency ms"])
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 600)
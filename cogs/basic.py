@@ -3,6 +3,7 @@ import voicelink
 import re
 
 from io import StringIO
+from typing import Union
 from discord import app_commands
 from discord.ext import commands
 from function import (
@@ -30,6 +31,13 @@ searchPlatform = {
 }
 
 
+def partial_load(ctx: Union[commands.Context, discord.Interaction], playlist: voicelink.Playlist):
+    """Reports a streamed playlist which stopped loading after some of its tracks were queued."""
+    async def on_error(error: Exception, added: int) -> None:
+        await send(ctx, "playlistLoadPartial", playlist.name, added, playlist.total_tracks, error)
+    return on_error
+
+
 async def nowplay(ctx: commands.Context, player: voicelink.Player):
     track = player.current
     if not track:
@@ -82,8 +90,7 @@ class Basic(commands.Cog):
             return
 
         history: dict[str, str] = {}
-        for track_id in reversed(await get_user(interaction.user.id, "history")):
-            track_dict = voicelink.decode(track_id)
+        for track_dict in reversed(voicelink.decode_many(await get_user(interaction.user.id, "history", view=True))):
             history[track_dict["identifier"]] = track_dict
 
         history_tracks = [app_commands.Choice(name=truncate_string(
@@ -121,13 +128,15 @@ class Basic(commands.Cog):
         if not player.is_user_join(ctx.author):
             return await send(ctx, "notInChannel", ctx.author.mention, player.channel.mention, ephemeral=True)
 
-        tracks = await player.get_tracks(query, requester=ctx.author)
+        batches = player.iter_tracks(query, requester=ctx.author)
+        tracks = await anext(batches, None)
         if not tracks:
+            await batches.aclose()
             return await send(ctx, "noTrackFound")
 
         try:
             if isinstance(tracks, voicelink.Playlist):
-                index = await player.add_track(tracks.tracks)
+                index = await player.ingest(tracks.tracks, batches, on_error=partial_load(ctx, tracks))
                 await send(ctx, "playlistLoad", tracks.name, index)
             else:
                 position = await player.add_track(tracks[0])
@@ -136,6 +145,9 @@ class Basic(commands.Cog):
         except voicelink.QueueFull as e:
             await ctx.send(e)
         finally:
+            # The player keeps loading the rest of a playlist in the background
+            if not isinstance(tracks, voicelink.Playlist):
+                await batches.aclose()
             if not player.is_playing:
                 await player.do_next()
 
@@ -162,13 +174,15 @@ class Basic(commands.Cog):
         if not player.is_user_join(interaction.user):
             return await send(interaction, "notInChannel", interaction.user.mention, player.channel.mention, ephemeral=True)
 
-        tracks = await player.get_tracks(query, requester=interaction.user)
+        batches = player.iter_tracks(query, requester=interaction.user)
+        tracks = await anext(batches, None)
         if not tracks:
+            await batches.aclose()
             return await send(interaction, "noTrackFound")
 
         try:
             if isinstance(tracks, voicelink.Playlist):
-                index = await player.add_track(tracks.tracks)
+                index = await player.ingest(tracks.tracks, batches, on_error=partial_load(interaction, tracks))
                 await send(interaction, "playlistLoad", tracks.name, index)
             else:
                 position = await player.add_track(tracks[0])
@@ -181,6 +195,9 @@ class Basic(commands.Cog):
             return await interaction.response.send_message(e, ephemeral=True)
 
         finally:
+            # The player keeps loading the rest of a playlist in the background
+            if not isinstance(tracks, voicelink.Playlist):
+                await batches.aclose()
             if not player.is_playing:
                 await player.do_next()
 
@@ -250,13 +267,15 @@ class Basic(commands.Cog):
         if not player.is_user_join(interaction.user):
             return await send(interaction, "notInChannel", interaction.user.mention, player.channel.mention, ephemeral=True)
 
-        tracks = await player.get_tracks(query, requester=interaction.user)
+        batches = player.iter_tracks(query, requester=interaction.user)
+        tracks = await anext(batches, None)
         if not tracks:
+            await batches.aclose()
             return await send(interaction, "noTrackFound")
 
         try:
             if isinstance(tracks, voicelink.Playlist):
-                index = await player.add_track(tracks.tracks)
+                index = await player.ingest(tracks.tracks, batches, on_error=partial_load(interaction, tracks))
                 await send(interaction, "playlistLoad", tracks.name, index)
             else:
                 position = await player.add_track(tracks[0])
@@ -269,6 +288,9 @@ class Basic(commands.Cog):
             return await interaction.response.send_message(e, ephemeral=True)
 
         finally:
+            # The player keeps loading the rest of a playlist in the background
+            if not isinstance(tracks, voicelink.Playlist):
+                await batches.aclose()
             if not player.is_playing:
                 await player.do_next()
 
@@ -610,8 +632,14 @@ class Basic(commands.Cog):
             track_ids = bytes.split(b"\n")[-1]
             track_ids = track_ids.decode().split(",")
 
-            tracks = (voicelink.Track(track_id=track_id, info=voicelink.decode(
-                track_id), requester=ctx.author) for track_id in track_ids)
+            # A LazyTrack only decodes when it is first read, so a corrupt id would fail somewhere in
+            # playback instead of here. Validate the file up front; the results land in the decode cache.
+            try:
+                voicelink.decode_many(track_ids)
+            except Exception:
+                return await send(ctx, "decodeError", ephemeral=True)
+
+            tracks = [voicelink.LazyTrack(track_id=track_id, requester=ctx.author) for track_id in track_ids]
             if not tracks:
                 return await send(ctx, "noTrackFound")
 
@@ -1,3 +1,4 @@
+import os
 import voicelink
 import asyncio
 import discord
@@ -17,6 +18,13 @@ class Listeners(commands.Cog):
     async def start_nodes(self) -> None:
         """노드를 연결하고 초기화합니다."""
         await self.bot.wait_until_ready()
+        self.voicelink.setup_track_cache(**func.settings.track_cache)
+        self.voicelink.setup_load_score(**func.settings.node_load_score)
+        voicelink.decode_cache.configure(**func.settings.decode_cache)
+        spotify_cache = dict(func.settings.spotify_cache)
+        if spotify_cache.get("path"):
+            spotify_cache["path"] = os.path.join(func.ROOT_DIR, spotify_cache["path"])
+        self.voicelink.setup_spotify_cache(**spotify_cache)
         for n in func.settings.nodes.values():
             try:
                 await self.voicelink.create_node(
@@ -28,6 +36,8 @@ class Listeners(commands.Cog):
             except Exception as e:
                 print(f'노드 {n["identifier"]}가 연결할 수 없습니다! - 이유: {e}')
 
+        self.voicelink.setup_rebalancer(**func.settings.rebalancer)
+
     @commands.Cog.listener()
     async def on_voicelink_track_end(self, player: voicelink.Player, track, _):
         await player.do_next()
@@ -9,6 +9,11 @@ from function import (
     time as ctime,
     get_user,
     update_user,
+    get_playlist_tracks,
+    get_playlist_stats,
+    add_playlist_tracks,
+    remove_playlist_track,
+    delete_playlist,
     check_roles,
     get_lang,
     settings,
@@ -27,7 +32,7 @@ def assign_playlistId(existed: list) -> str:
 
 
 async def check_playlist_perms(user_id: int, author_id: int, d_id: str) -> dict:
-    playlist = await get_user(author_id, 'playlist')
+    playlist = await get_user(author_id, 'playlist', view=True)
     playlist = playlist.get(d_id)
     if not playlist or user_id not in playlist['perms']['read']:
         return {}
@@ -35,26 +40,36 @@ async def check_playlist_perms(user_id: int, author_id: int, d_id: str) -> dict:
 
 
 async def check_playlist(ctx: commands.Context, name: str = None, full: bool = False, share: bool = True) -> dict:
-    user = await get_user(ctx.author.id, 'playlist')
+    user = await get_user(ctx.author.id, 'playlist', view=True)
 
     await ctx.defer()
     if full:
         return user
 
     if not name:
-        return {'playlist': user['200'], 'position': 1, 'id': "200"}
+        return {'playlist': user['200'], 'position': 1, 'id': "200", 'owner': ctx.author.id, 'source': "200"}
 
     for index, data in enumerate(user, start=1):
         playlist = user[data]
         if playlist['name'].lower() == name:
+            # owner and source point to where the tracks are stored
+            owner, source = ctx.author.id, data
             if playlist['type'] == 'share' and share:
+                owner, source = playlist['user'], playlist['referId']
                 playlist = await check_playlist_perms(ctx.author.id, playlist['user'], playlist['referId'])
                 if not playlist or ctx.author.id not in playlist['perms']['read']:
                     return {'playlist': None, 'position': index, 'id': data}
-            return {'playlist': playlist, 'position': index, 'id': data}
+            return {'playlist': playlist, 'position': index, 'id': data, 'owner': owner, 'source': source}
     return {'playlist': None, 'position': None, 'id': None}
 
 
+def playlist_loader(owner_id: int, playlist_id: str):
+    """Returns a page loader for PlaylistView, which only decodes the tracks it shows."""
+    async def load(start: int, limit: int) -> list:
+        return voicelink.decode_many(await get_playlist_tracks(owner_id, playlist_id, start, limit))
+    return load
+
+
 async def search_playlist(url: str, requester: discord.Member, time_needed: bool = True) -> dict:
     try:
         tracks = await voicelink.NodePool.get_node().get_tracks(url, requester=requester)
@@ -76,7 +91,7 @@ class Playlists(commands.Cog, name="playlist"):
         self.description = "이것은 Vocard 재생 목록 시스템입니다. 즐겨찾기를 저장하고 Vocard를 사용하여 모든 서버에서 재생할 수 있습니다."
 
     async def playlist_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
-        playlists_raw: dict[str, dict] = await get_user(interaction.user.id, 'playlist')
+        playlists_raw: dict[str, dict] = await get_user(interaction.user.id, 'playlist', view=True)
         playlists = [value['name']
                      for value in playlists_raw.values()] if playlists_raw else []
         if current:
@@ -116,22 +131,22 @@ class Playlists(commands.Cog, name="playlist"):
 
         if result['playlist']['type'] == 'link':
             tracks = await search_playlist(result['playlist']['uri'], ctx.author, time_needed=False)
+            if tracks and value and 0 < value <= (len(tracks['tracks'])):
+                tracks['tracks'] = [tracks['tracks'][value - 1]]
         else:
-            if not result['playlist']['tracks']:
+            # Only read the range that is going to be played
+            start, limit = (value - 1, 1) if value and 0 < value <= max_t else (0, max_t)
+            track_ids = await get_playlist_tracks(result['owner'], result['source'], start, limit)
+            if not track_ids:
                 return await send(ctx, 'playlistNoTrack', result['playlist']['name'], ephemeral=True)
 
-            playtrack = []
-            for track in result['playlist']['tracks'][:max_t]:
-                playtrack.append(voicelink.Track(
-                    track_id=track, info=voicelink.decode(track), requester=ctx.author))
+            playtrack = [voicelink.LazyTrack(track_id=track, requester=ctx.author) for track in track_ids]
 
             tracks = {"name": result['playlist']['name'], "tracks": playtrack}
 
         if not tracks:
             return await send(ctx, 'playlistNoTrack', result['playlist']['name'], ephemeral=True)
 
-        if value and 0 < value <= (len(tracks['tracks'])):
-            tracks['tracks'] = [tracks['tracks'][value - 1]]
         await player.add_track(tracks['tracks'])
         await send(ctx, 'playlistPlay', result['playlist']['name'], len(tracks['tracks'][:max_t]))
 
@@ -146,8 +161,9 @@ class Playlists(commands.Cog, name="playlist"):
         rank, max_p, max_t = check_roles()
 
         results = []
-        for index, data in enumerate(user, start=1):
-            playlist = user[data]
+        # Iterate over a snapshot, revoked shares are removed from the cached playlists below
+        for index, (data, entry) in enumerate(list(user.items()), start=1):
+            playlist = entry
             time = 0
             try:
                 if playlist['type'] == 'link':
@@ -156,7 +172,9 @@ class Playlists(commands.Cog, name="playlist"):
                                    'name'], 'tracks': tracks['tracks'], 'perms': playlist['perms'], 'type': playlist['type']})
 
                 else:
+                    owner, source = ctx.author.id, data
                     if share := playlist['type'] == 'share':
+                        owner, source = playlist['user'], playlist['referId']
                         playlist = await check_playlist_perms(ctx.author.id, playlist['user'], playlist['referId'])
                         if not playlist:
                             await update_user(ctx.author.id, {"$unset": {f"playlist.{data}": 1}})
@@ -164,22 +182,19 @@ class Playlists(commands.Cog, name="playlist"):
 
                         if playlist['type'] == 'link':
                             tracks = await search_playlist(playlist['uri'], requester=ctx.author)
-                            results.append({'emoji': ('🔒' if max_p < index else '🤝'), 'id': data, 'time': tracks['time'], 'name': user[data][
-                                           'name'], 'tracks': tracks['tracks'], 'perms': playlist['perms'], 'owner': user[data]['user'], 'type': 'share'})
+                            results.append({'emoji': ('🔒' if max_p < index else '🤝'), 'id': data, 'time': tracks['time'], 'name': entry[
+                                           'name'], 'tracks': tracks['tracks'], 'perms': playlist['perms'], 'owner': entry['user'], 'type': 'share'})
                             continue
 
-                    init = []
-                    for track in playlist['tracks']:
-                        dt = voicelink.decode(track)
-                        time += dt.get("length", 0)
-                        init.append(dt)
-                    playlist['tracks'] = init
+                    count, time = await get_playlist_stats(owner, source)
+                    if time is None:
+                        time = sum(dt.get("length", 0) for dt in voicelink.decode_many(await get_playlist_tracks(owner, source)))
                     results.append({'emoji': ('🔒' if max_p < index else ('🤝' if share else '❤️')), 'id': data, 'time': ctime(
-                        time), 'name': user[data]['name'], 'tracks': playlist['tracks'], 'perms': playlist['perms'], 'owner': user[data].get('user', None), 'type': user[data]['type']})
+                        time), 'name': entry['name'], 'count': count, 'loader': playlist_loader(owner, source), 'perms': playlist['perms'], 'owner': entry.get('user', None), 'type': entry['type']})
 
             except:
-                results.append({'emoji': '⛔', 'id': data, 'time': '--', 'name': user[data]['name'], 'tracks': [
-                ], 'perms': user[data].get('perms', {}), 'type': user[data].get('type', '')})
+                results.append({'emoji': '⛔', 'id': data, 'time': '--', 'name': entry['name'], 'tracks': [
+                ], 'perms': entry.get('perms', {}), 'type': entry.get('type', '')})
 
         await ctx.send(view=PlaylistView(ctx.author, results))
 
@@ -188,7 +203,7 @@ class Playlists(commands.Cog, name="playlist"):
     @commands.dynamic_cooldown(cooldown_check, commands.BucketType.guild)
     async def create(self, ctx: commands.Context, name: str) -> None:
         "새 재생 목록을 생성합니다."
-        user = await get_user(ctx.author.id, 'playlist')
+        user = await get_user(ctx.author.id, 'playlist', view=True)
         if len(user) > 200:
             return await send(ctx, 'playlistLimitExceeded', ephemeral=True)
 
@@ -197,7 +212,10 @@ class Playlists(commands.Cog, name="playlist"):
 
         id = assign_playlistId(list(user.keys()))
         if id:
-            await update_user(ctx.author.id, {"$set": {f"playlist.{id}": {'name': name, 'type': 'regular', 'tracks': []}}})
+            playlist = {'name': name, 'type': 'regular'}
+            if settings.playlist_storage != "collection":
+                playlist['tracks'] = []
+            await update_user(ctx.author.id, {"$set": {f"playlist.{id}": playlist}})
             await send(ctx, 'playlistCreated', name)
         else:
             await send(ctx, 'playlistFailedToCreate', ephemeral=True)
@@ -215,7 +233,7 @@ class Playlists(commands.Cog, name="playlist"):
             await send(ctx, 'playlistNotDeletable', name, ephemeral=True)
             return
 
-        await update_user(ctx.author.id, {"$unset": {f"playlist.{result['id']}": 1}})
+        await delete_playlist(ctx.author.id, result['id'])
         await send(ctx, 'playlistDeleted', name)
 
     @playlist.command(name="rename", aliases=get_aliases("rename"))
@@ -228,7 +246,7 @@ class Playlists(commands.Cog, name="playlist"):
         if not result['playlist']:
             return await send(ctx, 'playlistNotFound', name, ephemeral=True)
 
-        user = await get_user(ctx.author.id, 'playlist')
+        user = await get_user(ctx.author.id, 'playlist', view=True)
         if any(p['name'].lower() == new_name.lower() for p in user.values()):
             return await send(ctx, 'playlistAlreadyExists', new_name, ephemeral=True)
 
@@ -247,10 +265,10 @@ class Playlists(commands.Cog, name="playlist"):
         if result['playlist']['type'] == 'share':
             return await send(ctx, 'playlistAlreadyShared', name, ephemeral=True)
 
-        id = assign_playlistId([key for key in await get_user(ctx.author.id, 'playlist')])
+        id = assign_playlistId([key for key in await get_user(ctx.author.id, 'playlist', view=True)])
         if not id:
             return await send(ctx, 'playlistShareFailed', ephemeral=True)
-        await update_user(ctx.author.id, {"$set": {f"playlist.{id}": {'name': result['playlist']['name'], 'type': 'share', 'tracks': result['playlist']['tracks'], 'user': ctx.author.id, 'referId': result['id'], 'perms': {'read': [ctx.author.id]}}}})
+        await update_user(ctx.author.id, {"$set": {f"playlist.{id}": {'name': result['playlist']['name'], 'type': 'share', **({'tracks': result['playlist']['tracks'].thaw()} if 'tracks' in result['playlist'] else {}), 'user': ctx.author.id, 'referId': result['id'], 'perms': {'read': [ctx.author.id]}}}})
         await send(ctx, 'playlistShared', name)
 
     @playlist.command(name="add", aliases=get_aliases("add"))
@@ -272,7 +290,7 @@ class Playlists(commands.Cog, name="playlist"):
         if not tracks:
             return await send(ctx, 'playlistTrackNotFound', ephemeral=True)
 
-        await update_user(ctx.author.id, {"$push": {f"playlist.{result['id']}.tracks": tracks['tracks']}})
+        await add_playlist_tracks(ctx.author.id, result['id'], [track.track_id for track in tracks['tracks']], [track.length for track in tracks['tracks']])
         await send(ctx, 'playlistTrackAdded', name)
 
     @playlist.command(name="remove", aliases=get_aliases("remove"))
@@ -286,11 +304,11 @@ class Playlists(commands.Cog, name="playlist"):
         if result['playlist']['type'] == 'share':
             return await send(ctx, 'playlistNotEditable', name, ephemeral=True)
 
-        if not (0 < index <= len(result['playlist']['tracks'])):
+        count, _ = await get_playlist_stats(ctx.author.id, result['id'])
+        if not (0 < index <= count):
             return await send(ctx, 'playlistTrackNotFound', ephemeral=True)
 
-        track = result['playlist']['tracks'].pop(index - 1)
-        await update_user(ctx.author.id, {"$set": {f"playlist.{result['id']}.tracks": result['playlist']['tracks']}})
+        await remove_playlist_track(ctx.author.id, result['id'], index=index - 1)
         await send(ctx, 'playlistTrackRemoved', name)
 
 
@@ -71,13 +71,14 @@ class Settings(commands.Cog, name="settings"):
     @settings.command(name="queue", aliases=get_aliases("queue"))
     @app_commands.choices(mode=[
         app_commands.Choice(name="공정한 대기열", value="FairQueue"),
+        app_commands.Choice(name="라운드 로빈 대기열", value="RoundRobinQueue"),
         app_commands.Choice(name="일반 대기열", value="Queue")
     ])
     @commands.has_permissions(manage_guild=True)
     @commands.dynamic_cooldown(cooldown_check, commands.BucketType.guild)
     async def queue(self, ctx: commands.Context, mode: str):
         "다른 유형의 대기열 모드로 전환합니다."
-        mode = "FairQueue" if mode.lower() == "fairqueue" else "Queue"
+        mode = {"fairqueue": "FairQueue", "roundrobinqueue": "RoundRobinQueue"}.get(mode.lower(), "Queue")
         await update_settings(ctx.guild.id, {"$set": {"queueType": mode}})
         await send(ctx, "setqueue", mode)
 
@@ -235,9 +236,54 @@ class Settings(commands.Cog, name="settings"):
             inline=False
         )
 
+        track_cache = voicelink.NodePool._track_cache.stats
+        decode_cache = voicelink.decode_cache.stats
+        embed.add_field(
+            name="🗃️ 캐시 정보",
+            value=f"```• 트랙 캐시:  {track_cache['entries']}개 ({formatBytes(track_cache['bytes'], True)})\n"
+                  f"• 적중률:    {track_cache['hit_rate'] * 100:.1f}%\n"
+                  f"• 적중/실패:  {track_cache['hits']}/{track_cache['misses']} (병합 {track_cache['coalesced']})\n"
+                  f"• 제거 수:   {track_cache['evictions']}\n"
+                  f"• 디코드 캐시: {decode_cache['entries']}/{decode_cache['max_entries']}개 (적중률 {decode_cache['hit_rate'] * 100:.1f}%, 제거 {decode_cache['evictions']})```",
+            inline=False
+        )
+
+        transition = voicelink.Player.transition_stats.summary
+        dispatch = voicelink.Player.dispatch_stats.summary
+        embed.add_field(
+            name="⏱️ 곡 전환 지연",
+            value=f"```• 재생 시작: 평균 {transition['avg']}ms / p95 {transition['p95']}ms / 최대 {transition['max']}ms\n"
+                  f"• 요청 전송: 평균 {dispatch['avg']}ms / p95 {dispatch['p95']}ms\n"
+                  f"• 측정 수:   {transition['count']}```",
+            inline=False
+        )
+
+        buffers = {"설정": func.SETTINGS_BUFFER.stats, "사용자": func.USERS_BUFFER.stats}
+        embed.add_field(
+            name="🗄️ DB 버퍼",
+            value="```" + "\n".join(
+                f"• {name}: {stats['entries']}/{stats['max_size']}개 (고정 {stats['pinned']}, 적중률 {stats['hit_rate'] * 100:.1f}%, 제거 {stats['evictions']}, 만료 {stats['expirations']})"
+                for name, stats in buffers.items()
+            ) + "```",
+            inline=False
+        )
+
+        history = func.HISTORY_BUFFER.stats
+        embed.add_field(
+            name="📝 재생 기록 저장",
+            value=f"```• 대기 중:   {history['pending']}곡\n"
+                  f"• 저장 횟수: {history['flushes']}회 (실패 {history['failures']})\n"
+                  f"• 배치 크기: 평균 {history['avg_batch']} / 최대 {history['max_batch']}\n"
+                  f"• 저장 시간: 평균 {history['avg_flush_ms']}ms / 최근 {history['last_flush_ms']}ms```",
+            inline=False
+        )
+
         node: voicelink.Node
         for name, node in voicelink.NodePool._nodes.items():
             total_memory = node.stats.used + node.stats.free
+            probe = node.probe_stats.summary
+            latency = f"{node.latency:.2f}ms" if node.latency != float("inf") else "n/a"
+            rest = f"{probe['rest_ewma']}ms" if probe['rest_ewma'] is not None else "n/a"
             embed.add_field(
                 name=f"{name} 노드 - " +
                 ("🟢 연결됨" if node._available else "🔴 연결 끊김"),
@@ -245,7 +291,8 @@ class Settings(commands.Cog, name="settings"):
                       f"• 플레이어 수:  {len(node._players)}\n"
                       f"• CPU 사용률:      {node.stats.cpu_process_load:.1f}%\n"
                       f"• RAM:      {formatBytes(node.stats.free)}/{formatBytes(total_memory, True)} ({(node.stats.free/total_memory) * 100:.1f}%)\n"
-                      f"• 대기 시간:  {node.latency:.2f}ms\n"
+                      f"• 대기 시간:  {latency} (p95 {probe['tcp']['p95']}ms)\n"
+                      f"• REST 응답:  {rest} (p95 {probe['rest']['p95']}ms, 실패 {probe['failures']})\n"
                       f"• 가동 시간:   {func.time(node.stats.uptime)}```",
                 inline=True
             )
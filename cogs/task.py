@@ -98,8 +98,11 @@ class Task(commands.Cog):
 
     @tasks.loop(hours=12.0)
     async def cache_cleaner(self):
-        func.SETTINGS_BUFFER.clear()  # 설정 버퍼 청소
-        func.USERS_BUFFER.clear()     # 사용자 버퍼 청소
+        await func.HISTORY_BUFFER.flush()  # 대기 중인 재생 기록 저장
+        await func.flush_write_queues()    # 대기 중인 DB 쓰기 저장
+        func.SETTINGS_BUFFER.expire()  # 만료된 설정 정리
+        func.USERS_BUFFER.expire()     # 만료된 사용자 정리
+        voicelink.decode_cache.clear()  # 트랙 디코드 캐시 청소
 
         errorFile = func.gen_report()  # 오류 보고서 생성
         if errorFile:
@@ -1,25 +1,233 @@
 import discord
+import asyncio
 import json
 import os
 import copy
+import random
 
 from discord.ext import commands
 from datetime import datetime
-from time import strptime
+from time import strptime, perf_counter, monotonic
 from io import BytesIO
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, Iterator
+from collections import OrderedDict
+from collections.abc import MutableMapping, Mapping, Sequence
 from addons import Settings, TOKENS
 
 from motor.motor_asyncio import (
     AsyncIOMotorClient,
     AsyncIOMotorCollection,
 )
+from pymongo import UpdateOne, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, OperationFailure
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SETTINGS_FILE = os.getenv("SETTINGS_FILE", "settings.json")
 
-if not os.path.exists(os.path.join(ROOT_DIR, "settings.json")):
+if not os.path.exists(os.path.join(ROOT_DIR, SETTINGS_FILE)):
     raise Exception("Settings file not set!")
 
+class TTLCache(MutableMapping):
+    """A bounded mapping with per-entry expiry and least-recently-used eviction.
+       Pinned keys are neither evicted nor expired, so the documents of guilds
+       with an active player stay in memory for as long as the player lives.
+    """
+
+    def __init__(self, *, max_size: int = 10000, ttl: float = 3600.0, jitter: float = 0.1) -> None:
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self.jitter: float = jitter
+
+        self._data: OrderedDict[Any, tuple[Any, float]] = OrderedDict()
+        self._pinned: set = set()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+
+    def configure(self, *, max_size: int = None, ttl: float = None, jitter: float = None) -> None:
+        self.max_size = max_size or self.max_size
+        self.ttl = ttl or self.ttl
+        self.jitter = self.jitter if jitter is None else jitter
+        self._evict()
+
+    def _expires_at(self, ttl: Optional[float]) -> float:
+        # Spread the expiry a little so entries loaded together don't all reload together
+        ttl = self.ttl if ttl is None else ttl
+        return monotonic() + ttl * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def __getitem__(self, key) -> Any:
+        try:
+            value, expires_at = self._data[key]
+        except KeyError:
+            self.misses += 1
+            raise
+
+        if expires_at <= monotonic() and key not in self._pinned:
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            raise KeyError(key)
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        self.set(key, value)
+
+    def set(self, key, value, ttl: Optional[float] = None) -> None:
+        self._data[key] = (value, self._expires_at(ttl))
+        self._data.move_to_end(key)
+        self._evict()
+
+    def __delitem__(self, key) -> None:
+        del self._data[key]
+
+    def __contains__(self, key) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and (entry[1] > monotonic() or key in self._pinned)
+
+    def __iter__(self) -> Iterator:
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evict(self) -> None:
+        if len(self._data) <= self.max_size:
+            return
+
+        for key in list(self._data):
+            if len(self._data) <= self.max_size:
+                break
+            if key not in self._pinned:
+                del self._data[key]
+                self.evictions += 1
+
+    def peek(self, key, default: Any = None) -> Any:
+        """Returns a cached value without touching its recency or the counters."""
+        entry = self._data.get(key)
+        return entry[0] if entry else default
+
+    def pin(self, key) -> None:
+        self._pinned.add(key)
+
+    def unpin(self, key) -> None:
+        self._pinned.discard(key)
+        if key in self._data:
+            self._data[key] = (self._data[key][0], min(self._data[key][1], self._expires_at(None)))
+
+    def expire(self) -> int:
+        """Drops every expired entry and returns how many were dropped."""
+        now = monotonic()
+        expired = [key for key, (_, expires_at) in self._data.items() if expires_at <= now and key not in self._pinned]
+        for key in expired:
+            del self._data[key]
+        self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self) -> int:
+        """Drops every entry except the pinned ones and returns how many were dropped."""
+        dropped = [key for key in self._data if key not in self._pinned]
+        for key in dropped:
+            del self._data[key]
+        return len(dropped)
+
+    def pinned(self) -> list:
+        return [key for key in self._pinned if key in self._data]
+
+    @property
+    def stats(self) -> dict[str, Union[int, float]]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_size": self.max_size,
+            "pinned": len(self._pinned),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+class ReadOnlyDict(Mapping):
+    """A read-only view of a buffered document. Nested dicts and lists are wrapped on access,
+       so reading never copies anything; `thaw` returns a mutable deep copy.
+    """
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict) -> None:
+        self._data: dict = data
+
+    def __repr__(self) -> str:
+        return f"ReadOnlyDict({self._data!r})"
+
+    def __getitem__(self, key) -> Any:
+        return readonly(self._data[key])
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other) -> bool:
+        return self._data == (other._data if isinstance(other, ReadOnlyDict) else other)
+
+    def thaw(self) -> dict:
+        return copy.deepcopy(self._data)
+
+class ReadOnlyList(Sequence):
+    """The list counterpart of ReadOnlyDict."""
+    __slots__ = ("_data",)
+
+    def __init__(self, data: list) -> None:
+        self._data: list = data
+
+    def __repr__(self) -> str:
+        return f"ReadOnlyList({self._data!r})"
+
+    def __getitem__(self, index) -> Any:
+        if isinstance(index, slice):
+            return [readonly(item) for item in self._data[index]]
+        return readonly(self._data[index])
+
+    def __contains__(self, value) -> bool:
+        return value in self._data
+
+    def __iter__(self) -> Iterator:
+        return map(readonly, self._data)
+
+    def __reversed__(self) -> Iterator:
+        return map(readonly, reversed(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other) -> bool:
+        return self._data == (other._data if isinstance(other, ReadOnlyList) else other)
+
+    def index(self, value, *args) -> int:
+        return self._data.index(value, *args)
+
+    def count(self, value) -> int:
+        return self._data.count(value)
+
+    def thaw(self) -> list:
+        return copy.deepcopy(self._data)
+
+def readonly(value: Any) -> Any:
+    if isinstance(value, dict):
+        return ReadOnlyDict(value)
+    if isinstance(value, list):
+        return ReadOnlyList(value)
+    return value
+
 # --------------- Cache Var ---------------
 tokens: TOKENS = TOKENS()
 settings: Settings
@@ -27,14 +235,15 @@ settings: Settings
 MONGO_DB: AsyncIOMotorClient
 SETTINGS_DB: AsyncIOMotorCollection
 USERS_DB: AsyncIOMotorCollection
+PLAYLIST_TRACKS_DB: Optional[AsyncIOMotorCollection] = None  # Set when playlist tracks are stored in their own collection
 
 # Stores error that not a Voicelink Exception
 ERROR_LOGS: dict[int, dict[int, str]] = {}
 LANGS: dict[str, dict[str, str]] = {}  # Stores all the languages in ./langs
 # Stores all the localization languages in ./local_langs
 LOCAL_LANGS: dict[str, dict[str, str]] = {}
-SETTINGS_BUFFER: dict[int, dict[str, Any]] = {}  # Cache guild language
-USERS_BUFFER: dict[str, dict] = {}
+SETTINGS_BUFFER: TTLCache = TTLCache(max_size=5000, ttl=21600)  # Cache guild settings
+USERS_BUFFER: TTLCache = TTLCache(max_size=10000, ttl=3600)
 
 USERS_BASE: dict[str, Any] = {
     'playlist': {
@@ -210,17 +419,13 @@ async def update_db(db: AsyncIOMotorCollection, tempStore: dict, filter: dict, d
 
             elif mode == "$push":
                 if isinstance(value, dict) and "$each" in value:
-                    nested_data.setdefault(
-                        cursors[-1], []).extend(value["$each"][value.get("$slice", len(value["$each"])):])
-                else:
-                    nested_data.setdefault(cursors[-1], []).extend([value])
-
-            elif mode == "$push":
-                if isinstance(value, dict) and "$each" in value:
-                    nested_data.setdefault(
-                        cursors[-1], []).extend(value["$each"])
-                    nested_data[cursors[-1]] = nested_data[cursors[-1]
-                                                           ][value.get("$slice", len(value["$each"])):]
+                    array = nested_data.setdefault(cursors[-1], [])
+                    array.extend(value["$each"])
+                    if (limit := value.get("$slice")) is not None:
+                        if limit < 0:
+                            del array[:limit]
+                        else:
+                            del array[limit:]
                 else:
                     nested_data.setdefault(cursors[-1], []).extend([value])
 
@@ -234,13 +439,26 @@ async def update_db(db: AsyncIOMotorCollection, tempStore: dict, filter: dict, d
             else:
                 return False
 
+    if queue := WRITE_QUEUES.get(db.name):
+        queue.put(filter, data)
+        return True
+
     result = await db.update_one(filter, data)
     return result.modified_count > 0
 
 
+async def _flush_pending_writes(db: AsyncIOMotorCollection, _id: Any) -> None:
+    # A document may have left the buffer while its writes are still queued
+    if (queue := WRITE_QUEUES.get(db.name)) and queue.has_pending(_id):
+        await queue.flush()
+    if db is USERS_DB and _id in HISTORY_BUFFER._pending:
+        await HISTORY_BUFFER.flush()
+
+
 async def get_settings(guild_id: int) -> dict[str, Any]:
     settings = SETTINGS_BUFFER.get(guild_id, None)
     if not settings:
+        await _flush_pending_writes(SETTINGS_DB, guild_id)
         settings = await SETTINGS_DB.find_one({"_id": guild_id})
         if not settings:
             await SETTINGS_DB.insert_one({"_id": guild_id})
@@ -254,12 +472,16 @@ async def update_settings(guild_id: int, data: dict[str, dict[str, Any]]) -> boo
     return await update_db(SETTINGS_DB, settings, {"_id": guild_id}, data)
 
 
-async def get_user(user_id: int, d_type: Optional[str] = None, need_copy: bool = True) -> Dict[str, Any]:
+async def get_user(user_id: int, d_type: Optional[str] = None, need_copy: bool = True, view: bool = False) -> Dict[str, Any]:
+    """Returns the user document, or one field of it. `view=True` returns a zero-copy read-only view,
+       otherwise a deep copy unless `need_copy` is False.
+    """
     user = USERS_BUFFER.get(user_id)
     if not user:
+        await _flush_pending_writes(USERS_DB, user_id)
         user = await USERS_DB.find_one({"_id": user_id})
         if not user:
-            user = {"_id": user_id, **USERS_BASE}
+            user = {"_id": user_id, **copy.deepcopy(USERS_BASE)}
             await USERS_DB.insert_one(user)
 
         USERS_BUFFER[user_id] = user
@@ -267,9 +489,612 @@ async def get_user(user_id: int, d_type: Optional[str] = None, need_copy: bool =
     if d_type:
         user = user.setdefault(d_type, copy.deepcopy(USERS_BASE.get(d_type)))
 
+    if view:
+        return readonly(user)
     return copy.deepcopy(user) if need_copy else user
 
 
 async def update_user(user_id: int, data: dict) -> bool:
     playlist = await get_user(user_id, need_copy=False)
     return await update_db(USERS_DB, playlist, {"_id": user_id}, data)
+
+
+# ------------ Playlist Track Storage ------------
+# With the "inline" playlist storage the tracks live in `playlist.<id>.tracks` of the user document.
+# With the "collection" storage every track is one document {owner, playlist, position, track, length}
+# in PLAYLIST_TRACKS_DB and the user document only keeps the playlist metadata.
+# Positions only order the tracks, they are unique per playlist but may have gaps, so several
+# processes can append to the same playlist and tracks are addressed by their rank, not their position.
+
+PLAYLIST_TRACKS_INDEX = [("owner", ASCENDING), ("playlist", ASCENDING), ("position", ASCENDING)]
+PLAYLIST_ADD_RETRIES = 5
+
+
+async def setup_playlist_storage(db: AsyncIOMotorCollection = None) -> None:
+    global PLAYLIST_TRACKS_DB
+
+    PLAYLIST_TRACKS_DB = db
+    if db is None:
+        return
+
+    try:
+        await db.create_index(PLAYLIST_TRACKS_INDEX, unique=True)
+    except OperationFailure as e:
+        # 85/86: an older non-unique index with the same keys exists
+        if e.code not in (85, 86):
+            raise
+        await db.drop_index(PLAYLIST_TRACKS_INDEX)
+        await db.create_index(PLAYLIST_TRACKS_INDEX, unique=True)
+
+
+def _playlist_filter(owner_id: int, playlist_id: str) -> dict:
+    return {"owner": owner_id, "playlist": str(playlist_id)}
+
+
+async def get_playlist_tracks(owner_id: int, playlist_id: str, start: int = 0, limit: int = None) -> list[str]:
+    """Returns the encoded tracks of a playlist from `start`, at most `limit` of them."""
+    if PLAYLIST_TRACKS_DB is None:
+        playlist = (await get_user(owner_id, "playlist", view=True)).get(str(playlist_id))
+        if not playlist or "tracks" not in playlist:
+            return []
+        return playlist["tracks"][start:start + limit if limit is not None else None]
+
+    cursor = PLAYLIST_TRACKS_DB.find(
+        _playlist_filter(owner_id, playlist_id), {"track": 1, "_id": 0}
+    ).sort("position", ASCENDING).skip(start)
+    if limit is not None:
+        cursor = cursor.limit(limit)
+    return [doc["track"] async for doc in cursor]
+
+
+async def get_playlist_stats(owner_id: int, playlist_id: str) -> tuple[int, Optional[int]]:
+    """Returns the number of tracks and their total length. The length is None for inline storage."""
+    if PLAYLIST_TRACKS_DB is None:
+        return len(await get_playlist_tracks(owner_id, playlist_id)), None
+
+    async for result in PLAYLIST_TRACKS_DB.aggregate([
+        {"$match": _playlist_filter(owner_id, playlist_id)},
+        {"$group": {"_id": None, "count": {"$sum": 1}, "length": {"$sum": "$length"}}}
+    ]):
+        return result["count"], result["length"]
+    return 0, 0
+
+
+async def playlist_contains(owner_id: int, playlist_id: str, track_id: str) -> bool:
+    if PLAYLIST_TRACKS_DB is None:
+        return track_id in await get_playlist_tracks(owner_id, playlist_id)
+    return await PLAYLIST_TRACKS_DB.find_one({**_playlist_filter(owner_id, playlist_id), "track": track_id}, {"_id": 1}) is not None
+
+
+async def add_playlist_tracks(owner_id: int, playlist_id: str, tracks: list[str], lengths: list[int] = None) -> bool:
+    if not tracks:
+        return False
+
+    if PLAYLIST_TRACKS_DB is None:
+        return await update_user(owner_id, {"$push": {f"playlist.{playlist_id}.tracks": {"$each": list(tracks)}}})
+
+    # The unique index rejects positions another process took in the meantime, then the batch is retried after it
+    lengths = lengths or [0] * len(tracks)
+    for _ in range(PLAYLIST_ADD_RETRIES):
+        last = await PLAYLIST_TRACKS_DB.find_one(_playlist_filter(owner_id, playlist_id), {"position": 1}, sort=[("position", DESCENDING)])
+        start = last["position"] + 1 if last else 0
+        docs = [
+            {**_playlist_filter(owner_id, playlist_id), "position": start + index, "track": track, "length": length}
+            for index, (track, length) in enumerate(zip(tracks, lengths))
+        ]
+        try:
+            await PLAYLIST_TRACKS_DB.insert_many(docs, ordered=True)
+            return True
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+            if inserted := e.details.get("nInserted", 0):
+                await PLAYLIST_TRACKS_DB.delete_many({"_id": {"$in": [doc["_id"] for doc in docs[:inserted]]}})
+    return False
+
+
+async def remove_playlist_track(owner_id: int, playlist_id: str, *, index: int = None, track_id: str = None) -> bool:
+    """Removes the track at `index`, or every occurrence of `track_id`."""
+    if PLAYLIST_TRACKS_DB is None:
+        if track_id is not None:
+            return await update_user(owner_id, {"$pull": {f"playlist.{playlist_id}.tracks": track_id}})
+
+        tracks = await get_playlist_tracks(owner_id, playlist_id)
+        if not 0 <= index < len(tracks):
+            return False
+        del tracks[index]
+        return await update_user(owner_id, {"$set": {f"playlist.{playlist_id}.tracks": tracks}})
+
+    if track_id is not None:
+        result = await PLAYLIST_TRACKS_DB.delete_many({**_playlist_filter(owner_id, playlist_id), "track": track_id})
+        return result.deleted_count > 0
+
+    if index < 0:
+        return False
+    doc = await PLAYLIST_TRACKS_DB.find_one(
+        _playlist_filter(owner_id, playlist_id), {"_id": 1}, sort=[("position", ASCENDING)], skip=index
+    )
+    if not doc:
+        return False
+    result = await PLAYLIST_TRACKS_DB.delete_one({"_id": doc["_id"]})
+    return result.deleted_count > 0
+
+
+async def delete_playlist(owner_id: int, playlist_id: str) -> bool:
+    if PLAYLIST_TRACKS_DB is not None:
+        await PLAYLIST_TRACKS_DB.delete_many(_playlist_filter(owner_id, playlist_id))
+    return await update_user(owner_id, {"$unset": {f"playlist.{playlist_id}": 1}})
+
+
+class HistoryBuffer:
+    """Write-behind buffer for the play history of users.
+       Pushes are applied to USERS_BUFFER right away, coalesced per user and written
+       to USERS_DB with one bulk_write every `interval` seconds or once `max_pending` tracks are waiting.
+    """
+
+    def __init__(self, *, limit: int = 25, interval: float = 5.0, max_pending: int = 500) -> None:
+        self.limit: int = limit
+        self.interval: float = interval
+        self.max_pending: int = max_pending
+
+        self._pending: dict[int, list[str]] = {}
+        self._pending_count: int = 0
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: asyncio.Lock = asyncio.Lock()
+
+        self.flushes: int = 0
+        self.failures: int = 0
+        self.written_tracks: int = 0
+        self.max_batch: int = 0
+        self.last_flush_ms: float = 0.0
+        self._total_batch: int = 0
+        self._total_flush_ms: float = 0.0
+
+    def configure(self, *, limit: int = None, interval: float = None, max_pending: int = None) -> None:
+        self.limit = limit or self.limit
+        self.interval = interval or self.interval
+        self.max_pending = max_pending or self.max_pending
+
+    async def push(self, user_id: int, track_id: str) -> None:
+        history = await get_user(user_id, "history", need_copy=False)
+        history.append(track_id)
+        del history[:-self.limit]
+
+        self._pending.setdefault(user_id, []).append(track_id)
+        self._pending_count += 1
+        if self._pending_count >= self.max_pending and not self._flush_lock.locked():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Writes every pending push and returns the number of users written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending, self._pending_count = self._pending, {}, 0
+            requests = [
+                UpdateOne({"_id": user_id}, {"$push": {"history": {"$each": tracks[-self.limit:], "$slice": -self.limit}}})
+                for user_id, tracks in pending.items()
+            ]
+
+            start = perf_counter()
+            try:
+                await USERS_DB.bulk_write(requests, ordered=False)
+            except Exception as e:
+                self.failures += 1
+                for user_id, tracks in pending.items():
+                    self._pending[user_id] = tracks + self._pending.get(user_id, [])
+                    self._pending_count += len(tracks)
+                print(f"Failed to write {len(requests)} history updates (Reason: {e})")
+                return 0
+
+            self.last_flush_ms = (perf_counter() - start) * 1000
+            self.flushes += 1
+            self.written_tracks += sum(len(tracks) for tracks in pending.values())
+            self.max_batch = max(self.max_batch, len(requests))
+            self._total_batch += len(requests)
+            self._total_flush_ms += self.last_flush_ms
+            return len(requests)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stops the flush loop and writes whatever is still pending."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    @property
+    def stats(self) -> dict[str, Union[int, float]]:
+        return {
+            "pending": self._pending_count,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "written_tracks": self.written_tracks,
+            "avg_batch": round(self._total_batch / self.flushes, 2) if self.flushes else 0.0,
+            "max_batch": self.max_batch,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 2) if self.flushes else 0.0
+        }
+
+HISTORY_BUFFER: HistoryBuffer = HistoryBuffer()
+
+
+def _paths_overlap(path: str, other: str) -> bool:
+    return path == other or path.startswith(other + ".") or other.startswith(path + ".")
+
+
+class WriteQueue:
+    """Coalescing write queue for one collection.
+       Updates for the same document are merged into a single update document while their
+       operators allow it. An update that conflicts with the pending one, i.e. touches an
+       overlapping path with another operator, starts a new update which is written in a later round.
+       Every round is sent with one unordered bulk_write.
+    """
+
+    MERGEABLE = ("$set", "$unset", "$inc", "$push", "$pull")
+
+    def __init__(self, collection: AsyncIOMotorCollection, *, interval: float = 1.0, max_pending: int = 1000) -> None:
+        self.collection: AsyncIOMotorCollection = collection
+        self.interval: float = interval
+        self.max_pending: int = max_pending
+
+        self._pending: dict[Any, tuple[dict, list[dict]]] = {}
+        self._pending_count: int = 0
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: asyncio.Lock = asyncio.Lock()
+
+        self.queued: int = 0
+        self.merged: int = 0
+        self.conflicts: int = 0
+        self.writes: int = 0
+        self.write_errors: int = 0
+        self.flushes: int = 0
+        self.last_flush_ms: float = 0.0
+
+    def put(self, filter: dict, data: dict) -> None:
+        key = filter["_id"] if filter.keys() == {"_id"} else object()
+        self.queued += 1
+
+        if entry := self._pending.get(key):
+            if self._merge(entry[1][-1], data):
+                self.merged += 1
+                return
+            self.conflicts += 1
+            entry[1].append(copy.deepcopy(data))
+        else:
+            self._pending[key] = (filter, [copy.deepcopy(data)])
+
+        self._pending_count += 1
+        if self._pending_count >= self.max_pending and not self._flush_lock.locked():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def has_pending(self, _id: Any) -> bool:
+        return _id in self._pending
+
+    @classmethod
+    def _can_merge(cls, update: dict, data: dict) -> bool:
+        touched = {path: op for op, fields in update.items() for path in fields}
+        for op, fields in data.items():
+            if op not in cls.MERGEABLE:
+                return False
+
+            for path, value in fields.items():
+                for other_path, other_op in touched.items():
+                    if not _paths_overlap(path, other_path):
+                        continue
+                    if path != other_path:
+                        return False
+                    if other_op != op and {op, other_op} != {"$set", "$unset"}:
+                        return False
+                    if op == "$push" and not cls._can_merge_push(update[op][path], value):
+                        return False
+                    if op == "$pull" and not (cls._pull_values(update[op][path]) is not None and cls._pull_values(value) is not None):
+                        return False
+        return True
+
+    @staticmethod
+    def _push_each(value) -> tuple[list, Optional[int]]:
+        if isinstance(value, dict) and "$each" in value:
+            return list(value["$each"]), value.get("$slice")
+        return [value], None
+
+    @classmethod
+    def _can_merge_push(cls, pending, value) -> bool:
+        for item in (pending, value):
+            if isinstance(item, dict) and "$each" in item and not item.keys() <= {"$each", "$slice"}:
+                return False
+        (_, pending_slice), (_, slice) = cls._push_each(pending), cls._push_each(value)
+        return pending_slice == slice and (slice is None or slice < 0)
+
+    @staticmethod
+    def _pull_values(value) -> Optional[list]:
+        if isinstance(value, dict):
+            return list(value["$in"]) if value.keys() == {"$in"} else None
+        return [value]
+
+    def _merge(self, update: dict, data: dict) -> bool:
+        if not self._can_merge(update, data):
+            return False
+
+        for op, fields in data.items():
+            for path, value in copy.deepcopy(fields).items():
+                if op in ("$set", "$unset"):
+                    opposite = update.get("$unset" if op == "$set" else "$set", {})
+                    opposite.pop(path, None)
+                    update.setdefault(op, {})[path] = value
+
+                elif op == "$inc":
+                    fields = update.setdefault(op, {})
+                    fields[path] = fields.get(path, 0) + value
+
+                elif op == "$push":
+                    fields = update.setdefault(op, {})
+                    if path in fields:
+                        each, slice = self._push_each(fields[path])
+                        each += self._push_each(value)[0]
+                        fields[path] = {"$each": each, **({"$slice": slice} if slice is not None else {})}
+                    else:
+                        fields[path] = value
+
+                elif op == "$pull":
+                    fields = update.setdefault(op, {})
+                    if path in fields:
+                        fields[path] = {"$in": self._pull_values(fields[path]) + self._pull_values(value)}
+                    else:
+                        fields[path] = value
+
+        for op in [op for op, fields in update.items() if not fields]:
+            del update[op]
+        return True
+
+    async def flush(self) -> int:
+        """Writes every pending update and returns the number of update documents written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending, self._pending_count = self._pending, {}, 0
+            start, written = perf_counter(), 0
+            rounds = max(len(updates) for _, updates in pending.values())
+            for index in range(rounds):
+                requests = [
+                    UpdateOne(filter, updates[index])
+                    for filter, updates in pending.values() if index < len(updates)
+                ]
+                try:
+                    result = await self.collection.bulk_write(requests, ordered=False)
+                    written += result.matched_count if result else len(requests)
+                except BulkWriteError as e:
+                    self.write_errors += len(e.details.get("writeErrors", []))
+                    print(f"{len(e.details.get('writeErrors', []))} queued writes to {self.collection.name} failed (Reason: {e})")
+                except Exception as e:
+                    for key, (filter, updates) in pending.items():
+                        if index < len(updates):
+                            # Updates queued while the round was in flight go after the failed ones
+                            failed = updates[index:]
+                            self._pending[key] = (filter, failed + self._pending.get(key, (filter, []))[1])
+                            self._pending_count += len(failed)
+                    print(f"Failed to write queued updates to {self.collection.name} (Reason: {e})")
+                    break
+
+            self.writes += written
+            self.flushes += 1
+            self.last_flush_ms = (perf_counter() - start) * 1000
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    @property
+    def stats(self) -> dict[str, Union[int, float]]:
+        return {
+            "pending": self._pending_count,
+            "queued": self.queued,
+            "merged": self.merged,
+            "conflicts": self.conflicts,
+            "writes": self.writes,
+            "write_errors": self.write_errors,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2)
+        }
+
+WRITE_QUEUES: dict[str, WriteQueue] = {}
+
+
+def enable_write_queues(*, enabled: bool = True, **options) -> None:
+    """Routes update_db calls for the settings and users collections through coalescing write queues."""
+    if not enabled:
+        return
+
+    for collection in (SETTINGS_DB, USERS_DB):
+        queue = WRITE_QUEUES[collection.name] = WriteQueue(collection, **options)
+        queue.start()
+
+
+async def flush_write_queues(close: bool = False) -> None:
+    for queue in WRITE_QUEUES.values():
+        await (queue.close() if close else queue.flush())
+
+
+class ChangeWatcher:
+    """Keeps a buffer in sync with changes made to its collection by other processes.
+       Updates of cached documents are patched in place, so references held elsewhere
+       (e.g. Player.settings) stay valid; deletes and unknown changes drop the entry.
+       `stream_factory(resume_after)` returns the change stream and defaults to `collection.watch`,
+       any async iterable of change events works in its place.
+       When the stream can't resume, unpinned entries are dropped and pinned ones are reloaded.
+       Errors the stream won't recover from (e.g. a standalone server) stop the watcher.
+    """
+
+    HISTORY_LOST = (260, 280, 286)  # InvalidResumeToken, ChangeStreamFatalError, ChangeStreamHistoryLost
+    UNSUPPORTED = (40573,)  # Change streams need a replica set
+    MAX_RETRY_DELAY = 300.0
+
+    def __init__(self, collection: AsyncIOMotorCollection, cache: TTLCache, *, stream_factory=None, retry_delay: float = 5.0) -> None:
+        self.collection: AsyncIOMotorCollection = collection
+        self.cache: TTLCache = cache
+        self.stream_factory = stream_factory or (lambda resume_after: collection.watch(resume_after=resume_after))
+        self.retry_delay: float = retry_delay
+
+        self.resume_token: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.events: int = 0
+        self.patched: int = 0
+        self.invalidated: int = 0
+        self.restarts: int = 0
+
+    @staticmethod
+    def _walk(document: dict, cursors: list[str]) -> Union[dict, list]:
+        for cursor in cursors:
+            document = document[int(cursor)] if isinstance(document, list) else document.setdefault(cursor, {})
+        return document
+
+    def _patch(self, document: dict, description: dict) -> None:
+        for path, value in description.get("updatedFields", {}).items():
+            *parents, field = path.split(".")
+            target = self._walk(document, parents)
+            if isinstance(target, list):
+                index = int(field)
+                target.extend([None] * (index + 1 - len(target)))
+                target[index] = value
+            else:
+                target[field] = value
+
+        for path in description.get("removedFields", []):
+            *parents, field = path.split(".")
+            target = self._walk(document, parents)
+            if isinstance(target, dict):
+                target.pop(field, None)
+
+        for truncated in description.get("truncatedArrays", []):
+            array = self._walk(document, truncated["field"].split("."))
+            del array[truncated["newSize"]:]
+
+    def apply(self, change: dict) -> None:
+        self.events += 1
+        operation = change.get("operationType")
+        if operation in ("drop", "dropDatabase", "rename", "invalidate"):
+            self.invalidated += self.cache.clear()
+            return
+
+        key = change.get("documentKey", {}).get("_id")
+        document = self.cache.peek(key)
+        if document is None:
+            return
+
+        try:
+            if operation == "update":
+                self._patch(document, change["updateDescription"])
+            elif operation in ("insert", "replace") and "fullDocument" in change:
+                document.clear()
+                document.update(change["fullDocument"])
+            else:
+                raise KeyError(operation)
+            self.patched += 1
+        except (KeyError, IndexError, ValueError, TypeError):
+            self.cache.pop(key, None)
+            self.invalidated += 1
+
+    async def _reload_pinned(self) -> None:
+        # Pinned documents are referenced elsewhere, so refresh them in place instead of dropping them
+        for key in self.cache.pinned():
+            try:
+                fresh = await self.collection.find_one({"_id": key})
+            except Exception:
+                continue
+            if fresh and (document := self.cache.peek(key)) is not None:
+                document.clear()
+                document.update(fresh)
+
+    async def _run(self) -> None:
+        delay = self.retry_delay
+        while True:
+            try:
+                async with self.stream_factory(self.resume_token) as stream:
+                    async for change in stream:
+                        self.apply(change)
+                        self.resume_token = change.get("_id")
+                        delay = self.retry_delay
+                return
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in self.UNSUPPORTED:
+                    print(f"Change stream of {self.collection.name} is not supported by this server (Reason: {e})")
+                    return
+
+                if e.code in self.HISTORY_LOST or (self.resume_token is not None and e.has_error_label("NonResumableChangeStreamError")):
+                    # The resume point fell out of the oplog, anything cached may have missed changes
+                    print(f"Change stream of {self.collection.name} could not resume (Reason: {e})")
+                    self.resume_token = None
+                    self.invalidated += self.cache.clear()
+                    await self._reload_pinned()
+                else:
+                    print(f"Change stream of {self.collection.name} failed (Reason: {e})")
+            except Exception as e:
+                print(f"Change stream of {self.collection.name} stopped (Reason: {e})")
+
+            self.restarts += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.MAX_RETRY_DELAY)
+
+    def start(self) -> None:
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "events": self.events,
+            "patched": self.patched,
+            "invalidated": self.invalidated,
+            "restarts": self.restarts
+        }
+
+CHANGE_WATCHERS: list[ChangeWatcher] = []
+
+
+def start_change_watchers(*, enabled: bool = False, **options) -> None:
+    """Watches the settings and users collections, requires MongoDB to run as a replica set."""
+    if not enabled:
+        return
+
+    for collection, cache in ((SETTINGS_DB, SETTINGS_BUFFER), (USERS_DB, USERS_BUFFER)):
+        watcher = ChangeWatcher(collection, cache, **options)
+        watcher.start()
+        CHANGE_WATCHERS.append(watcher)
+
+
+def stop_change_watchers() -> None:
+    for watcher in CHANGE_WATCHERS:
+        watcher.stop()
+    CHANGE_WATCHERS.clear()
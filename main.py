@@ -62,12 +62,20 @@ class BSG(commands.Bot):
         
         func.SETTINGS_DB = func.MONGO_DB[db_name]["Settings"]
         func.USERS_DB = func.MONGO_DB[db_name]["Users"]
+        if func.settings.playlist_storage == "collection":
+            await func.setup_playlist_storage(func.MONGO_DB[db_name]["PlaylistTracks"])
 
     async def setup_hook(self) -> None:
         func.langs_setup()
         
         # Connecting to MongoDB
         await self.connect_db()
+        func.SETTINGS_BUFFER.configure(**func.settings.settings_buffer)
+        func.USERS_BUFFER.configure(**func.settings.users_buffer)
+        func.HISTORY_BUFFER.configure(**func.settings.history_buffer)
+        func.HISTORY_BUFFER.start()
+        func.enable_write_queues(**func.settings.write_queue)
+        func.start_change_watchers(**func.settings.change_stream)
 
         # Loading all the module in `cogs` folder
         for module in os.listdir(func.ROOT_DIR + '/cogs'):
@@ -82,11 +90,17 @@ class BSG(commands.Bot):
             await self.ipc.start()
 
         if not func.settings.version or func.settings.version != update.__version__:
-            func.update_json("settings.json", new_data={"version": update.__version__})
+            func.update_json(func.SETTINGS_FILE, new_data={"version": update.__version__})
 
             await self.tree.set_translator(Translator())
             await self.tree.sync()
 
+    async def close(self) -> None:
+        func.stop_change_watchers()
+        await func.HISTORY_BUFFER.close()
+        await func.flush_write_queues(close=True)
+        await super().close()
+
     async def on_ready(self):
         print("------------------")
         print(f"Logging As {self.user}")
@@ -146,7 +160,7 @@ async def get_prefix(bot, message: discord.Message):
     return settings.get("prefix", func.settings.bot_prefix)
 
 # Loading settings
-func.settings = Settings(func.open_json("settings.json"))
+func.settings = Settings(func.open_json(func.SETTINGS_FILE))
 
 # Setup the bot object
 intents = discord.Intents.default()
@@ -0,0 +1,101 @@
+"""Moves playlist tracks between the user documents and the PlaylistTracks collection.
+
+    python migrate_playlists.py             inline -> collection
+    python migrate_playlists.py --revert    collection -> inline
+    python migrate_playlists.py --dry-run   only report what would be moved
+
+Stop the bot first, then set "playlist_storage" in settings.json to "collection"
+after migrating (or back to "inline" after reverting).
+"""
+
+import argparse
+
+from pymongo import MongoClient, ASCENDING
+
+import function as func
+from addons import Settings
+
+func.settings = Settings(func.open_json(func.SETTINGS_FILE))
+
+from voicelink import decode
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Playlist storage migration for BSG.')
+    parser.add_argument('--revert', action='store_true', help='Move the tracks back into the user documents.')
+    parser.add_argument('--dry-run', action='store_true', help='Report the changes without writing them.')
+    return parser.parse_args()
+
+def track_length(track_id: str) -> int:
+    try:
+        return decode(track_id).get("length", 0)
+    except Exception:
+        return 0
+
+def migrate(users, tracks, dry_run: bool) -> tuple[int, int]:
+    if not dry_run:
+        tracks.create_index(func.PLAYLIST_TRACKS_INDEX, unique=True)
+
+    moved_users, moved_tracks = 0, 0
+    for user in users.find({"playlist": {"$exists": True}}, {"playlist": 1}):
+        unset = {}
+        for pId, playlist in user["playlist"].items():
+            if "tracks" not in playlist:
+                continue
+
+            # Share and link playlists only hold a copy, their tracks come from elsewhere
+            if playlist.get("type") not in ("share", "link"):
+                docs = [
+                    {"owner": user["_id"], "playlist": pId, "position": position, "track": track_id, "length": track_length(track_id)}
+                    for position, track_id in enumerate(playlist["tracks"])
+                ]
+                if not dry_run:
+                    tracks.delete_many({"owner": user["_id"], "playlist": pId})
+                    if docs:
+                        tracks.insert_many(docs)
+                moved_tracks += len(docs)
+
+            unset[f"playlist.{pId}.tracks"] = ""
+
+        if unset:
+            moved_users += 1
+            if not dry_run:
+                users.update_one({"_id": user["_id"]}, {"$unset": unset})
+
+    return moved_users, moved_tracks
+
+def revert(users, tracks, dry_run: bool) -> tuple[int, int]:
+    playlists: dict[tuple, list[str]] = {}
+    for doc in tracks.find({}, {"_id": 0, "owner": 1, "playlist": 1, "track": 1}).sort(
+        [("owner", ASCENDING), ("playlist", ASCENDING), ("position", ASCENDING)]
+    ):
+        playlists.setdefault((doc["owner"], doc["playlist"]), []).append(doc["track"])
+
+    moved_users, moved_tracks = set(), 0
+    for (owner, pId), track_ids in playlists.items():
+        if not dry_run:
+            result = users.update_one(
+                {"_id": owner, f"playlist.{pId}": {"$exists": True}},
+                {"$set": {f"playlist.{pId}.tracks": track_ids}}
+            )
+            if not result.matched_count:
+                continue
+            tracks.delete_many({"owner": owner, "playlist": pId})
+        moved_users.add(owner)
+        moved_tracks += len(track_ids)
+
+    return len(moved_users), moved_tracks
+
+def main():
+    args = parse_args()
+    if not ((db_name := func.tokens.mongodb_name) and (db_url := func.tokens.mongodb_url)):
+        raise Exception("MONGODB_NAME and MONGODB_URL can't not be empty in settings.json")
+
+    database = MongoClient(host=db_url)[db_name]
+    users, tracks = database["Users"], database["PlaylistTracks"]
+
+    moved_users, moved_tracks = (revert if args.revert else migrate)(users, tracks, args.dry_run)
+    print(f"{'Would move' if args.dry_run else 'Moved'} {moved_tracks} tracks of {moved_users} users "
+          f"{'back into the user documents' if args.revert else 'into PlaylistTracks'}.")
+
+if __name__ == "__main__":
+    main()
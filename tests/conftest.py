@@ -0,0 +1,20 @@
+import json
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# function.py refuses to import without a settings file, give it an empty one
+_settings = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+json.dump({}, _settings)
+_settings.close()
+os.environ.setdefault("SETTINGS_FILE", _settings.name)
+os.environ.setdefault("BUG_REPORT_CHANNEL_ID", "0")
+
+import function as func
+from addons import Settings
+
+func.settings = Settings(func.open_json(func.SETTINGS_FILE))
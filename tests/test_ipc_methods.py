@@ -0,0 +1,52 @@
+import asyncio
+
+from types import SimpleNamespace
+
+from voicelink.queue import Queue
+from web.ipc.methods import moveTrack
+
+
+class Track:
+    def __init__(self, name: str) -> None:
+        self.uri = f"https://example.com/{name}"
+        self.track_id = name
+
+
+def make_player(names: str, played: int) -> SimpleNamespace:
+    queue = Queue(100, True, lambda key: key)
+    for name in names:
+        queue.put(Track(name))
+    for _ in range(played):
+        queue.get()
+
+    return SimpleNamespace(
+        queue=queue,
+        guild=SimpleNamespace(id=1),
+        is_privileged=lambda member: True
+    )
+
+
+def move(player: SimpleNamespace, position: int, new_position: int) -> dict:
+    member = SimpleNamespace(id=2)
+    return asyncio.run(moveTrack(player, member, {"position": position, "newPosition": new_position}))
+
+
+def test_move_within_upcoming_tracks():
+    player = make_player("abcdefg", played=2)
+
+    result = move(player, 3, 5)
+
+    assert [track.track_id for track in player.queue._queue] == list("abcefdg")
+    assert result["position"] == {"index": 2, "track_id": "d"}
+    assert result["newPosition"] == {"index": 4}
+    assert player.queue._uri_counts()[Track("d").uri] == 1
+
+
+def test_move_into_history():
+    player = make_player("abcdefg", played=2)
+
+    result = move(player, 4, 0)
+
+    assert [track.track_id for track in player.queue._queue] == list("eabcdfg")
+    assert result["position"]["track_id"] == "e"
+    assert player.queue._position == 3
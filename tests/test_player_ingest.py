@@ -0,0 +1,72 @@
+import asyncio
+
+from voicelink.exceptions import QueueFull
+from voicelink.player import Player
+from voicelink.queue import Queue
+
+
+class Track:
+    def __init__(self, name: str) -> None:
+        self.uri = f"https://example.com/{name}"
+        self.track_id = name
+
+
+class FakePlayer:
+    IPC_ADD_BATCH = Player.IPC_ADD_BATCH
+    is_playing = True
+
+    ingest = Player.ingest
+    _ingest_batches = Player._ingest_batches
+    _overflowed = Player._overflowed
+    _run_in_background = Player._run_in_background
+
+    def __init__(self, size: int) -> None:
+        self.queue = Queue(size, True, lambda key: key)
+        self._background_tasks = set()
+        self._bot = type("Bot", (), {"loop": asyncio.get_running_loop()})()
+
+    def get_msg(self, key: str) -> str:
+        return "{}"
+
+    async def _notify_added(self, tracks: list) -> None:
+        pass
+
+
+async def pages(*sizes: int):
+    for page, size in enumerate(sizes):
+        yield [Track(f"{page}-{index}") for index in range(size)]
+
+
+async def ingest(size: int, first: int, *rest: int) -> tuple:
+    player, errors = FakePlayer(size), []
+
+    async def on_error(error: Exception, added: int) -> None:
+        errors.append((error, added))
+
+    added = await player.ingest([Track(f"first-{index}") for index in range(first)], pages(*rest), on_error=on_error)
+    await asyncio.gather(*player._background_tasks)
+    return player, added, errors
+
+
+def test_ingest_loads_every_page():
+    player, added, errors = asyncio.run(ingest(100, 10, 10, 10))
+
+    assert added == 10
+    assert player.queue.count == 30
+    assert not errors
+
+
+def test_ingest_reports_a_page_that_only_partly_fits():
+    player, added, errors = asyncio.run(ingest(25, 10, 10, 10))
+
+    assert added == 10
+    assert player.queue.count == 25
+    assert len(errors) == 1
+    assert isinstance(errors[0][0], QueueFull) and errors[0][1] == 25
+
+
+def test_ingest_reports_an_overflowing_first_page():
+    player, added, errors = asyncio.run(ingest(5, 10, 10))
+
+    assert added == 5
+    assert len(errors) == 1 and errors[0][1] == 5
@@ -0,0 +1,40 @@
+import pytest
+
+from voicelink.queue import FairQueue, Queue, RoundRobinQueue
+
+
+class Requester:
+    def __init__(self, id: int) -> None:
+        self.id = id
+
+
+class Track:
+    def __init__(self, name: str, requester: Requester = None) -> None:
+        self.uri = f"https://example.com/{name}"
+        self.track_id = name
+        self.requester = requester
+
+
+def test_move_keeps_uri_index():
+    queue = Queue(100, False, lambda key: key)
+    for name in "abcd":
+        queue.put(Track(name))
+
+    queue.move(1, 3)
+
+    assert all(count == 1 for count in queue._uri_counts().values())
+
+
+@pytest.mark.parametrize("cls", [FairQueue, RoundRobinQueue])
+def test_extend_returns_the_tracks_that_fit(cls):
+    queue = cls(10, True, lambda key: key)
+    first, second = Requester(1), Requester(2)
+    for index in range(6):
+        queue.put(Track(f"a{index}", first))
+    for _ in range(4):
+        queue.get()
+
+    added = queue.extend([Track(f"b{index}", second) for index in range(10)])
+
+    assert len(added) == 8
+    assert queue.count == 10
@@ -29,7 +29,9 @@ from discord.ext import commands
 from . import ButtonOnCooldown
 from function import (
     get_user,
-    update_user,
+    get_playlist_stats,
+    playlist_contains,
+    add_playlist_tracks,
     check_roles
 )
 
@@ -186,14 +188,15 @@ class Add(ControlButton):
             return await self.send(interaction, "noTrackPlaying")
         if track.is_stream:
             return await self.send(interaction, "playlistAddError")
-        user = await get_user(interaction.user.id, 'playlist')
+        user = await get_user(interaction.user.id, 'playlist', view=True)
         rank, max_p, max_t = check_roles()
-        if len(user['200']['tracks']) >= max_t:
+        count, _ = await get_playlist_stats(interaction.user.id, '200')
+        if count >= max_t:
             return await self.send(interaction, "playlistlimited", max_t, ephemeral=True)
 
-        if track.track_id in user['200']['tracks']:
+        if await playlist_contains(interaction.user.id, '200', track.track_id):
             return await self.send(interaction, "playlistrepeated", ephemeral=True)
-        respond = await update_user(interaction.user.id, {"$push": {'playlist.200.tracks': track.track_id}})
+        respond = await add_playlist_tracks(interaction.user.id, '200', [track.track_id], [track.length])
         if respond:
             await self.send(interaction, "playlistAdded", track.title, interaction.user.mention, user['200']['name'], ephemeral=True)
         else:
@@ -23,6 +23,7 @@ SOFTWARE.
 
 import discord
 import function
+import voicelink
 import io
 import contextlib
 import textwrap
@@ -76,6 +77,34 @@ class CogsDropdown(discord.ui.Select):
 
         await interaction.response.send_message(f"Reloaded `{selected}` sucessfully!", ephemeral=True)
 
+class NodesDropdown(discord.ui.Select):
+    def __init__(self):
+        super().__init__(
+            placeholder="Select a node to drain or undrain...",
+            min_values=1, max_values=1,
+            options=[
+                discord.SelectOption(
+                    label=identifier,
+                    description=f"{'Draining' if node.is_draining else 'Active'} - {node.player_count} players"
+                )
+                for identifier, node in voicelink.NodePool._nodes.items()
+            ] or [discord.SelectOption(label="No nodes")],
+        )
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        identifier = self.values[0]
+        node = voicelink.NodePool._nodes.get(identifier)
+        if not node:
+            return await interaction.response.send_message(f"Unable to find the node `{identifier}`!", ephemeral=True)
+
+        if node.is_draining:
+            voicelink.NodePool.undrain_node(identifier)
+            return await interaction.response.send_message(f"`{identifier}` accepts new players again.", ephemeral=True)
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        moved = await voicelink.NodePool.drain_node(identifier)
+        await interaction.followup.send(f"Draining `{identifier}`, moved {moved} players. {node.player_count} players left.", ephemeral=True)
+
 class ExceutePanel(discord.ui.View):
     def __init__(self, bot, *, timeout = 180):
         self.bot: commands.Bot = bot
@@ -166,6 +195,12 @@ class CogsView(discord.ui.View):
 
         self.add_item(CogsDropdown(bot))
 
+class NodesView(discord.ui.View):
+    def __init__(self, *, timeout: float | None = 180):
+        super().__init__(timeout=timeout)
+
+        self.add_item(NodesDropdown())
+
 class DebugView(discord.ui.View):
     def __init__(self, bot, *, timeout: float | None = 180):
         self.bot: commands.Bot = bot
@@ -181,6 +216,10 @@ class DebugView(discord.ui.View):
     async def reload_cog(self, interaction: discord.Interaction, button: discord.ui.Button):
         return await interaction.response.send_message("Reload Cogs", view=CogsView(self.bot), ephemeral=True)
     
+    @discord.ui.button(label='Nodes', emoji="🛠️")
+    async def drain_node(self, interaction: discord.Interaction, button: discord.ui.Button):
+        return await interaction.response.send_message("Drain Nodes", view=NodesView(), ephemeral=True)
+
     @discord.ui.button(label='Send Logs', emoji="📥", style=discord.ButtonStyle.red)
     async def send_error_logs(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not function.ERROR_LOGS:
@@ -52,7 +52,7 @@ class Select_playlist(discord.ui.Select):
             return await interaction.response.edit_message(embed=self.view.viewEmbed, view=self.view)
         
         self.view.current = self.view.results[int(self.values[0].split(". ")[0]) - 1]
-        self.view.page = ceil(len(self.view.current['tracks']) / 7)
+        self.view.page = ceil(self.view.track_count / 7)
         self.view.current_page = 1
         self.view.toggle_btn(False)
         await interaction.response.edit_message(embed=await self.view.build_embed(), view=self.view)
@@ -83,6 +83,12 @@ class PlaylistView(discord.ui.View):
     async def on_error(self, error, item, interaction) -> None:
         return
 
+    @property
+    def track_count(self) -> int:
+        if 'count' in self.current:
+            return self.current['count']
+        return len(self.current['tracks'])
+
     def toggle_btn(self, action: bool) -> None:
         for child in self.children:
             if child.custom_id not in ("delete", "selector"):
@@ -90,11 +96,14 @@ class PlaylistView(discord.ui.View):
         
     async def build_embed(self) -> discord.Embed:
         offset: int = self.current_page * 7
-        tracks: list[Track] = self.current['tracks'][(offset-7):offset]
+        if loader := self.current.get('loader'):
+            tracks: list = await loader(offset - 7, 7)
+        else:
+            tracks: list[Track] = self.current['tracks'][(offset-7):offset]
         texts = await func.get_lang(self.author.guild.id, "playlistView", "playlistViewDesc", "settingsPermTitle", "playlistViewPermsValue", "playlistViewPermsValue2", "playlistViewTrack", "playlistNoTrack", "playlistViewPage")
 
         embed = discord.Embed(title=texts[0], color=func.settings.embed_color)
-        embed.description = texts[1].format(self.current['name'], self.current['id'], len(self.current['tracks']), owner if (owner := self.current.get('owner')) else f"{self.author.id} (You)", self.current['type']) + "\n"
+        embed.description = texts[1].format(self.current['name'], self.current['id'], self.track_count, owner if (owner := self.current.get('owner')) else f"{self.author.id} (You)", self.current['type']) + "\n"
         
         perms = self.current['perms']
         if self.current['type'] == 'share':
@@ -35,4 +35,4 @@ from .player import Player, connect_channel
 from .pool import *
 from .queue import *
 from .placeholders import Placeholders, build_embed
-from .formatter import encode, decode
+from .formatter import encode, decode, decode_many, decode_cache
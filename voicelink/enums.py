@@ -72,11 +72,18 @@ class NodeAlgorithm(Enum):
         NodeAlgorithm.by_region returns a node based on its voice region,
         which the region is specified by the user in the method as an arg. 
         This method will only work if you set a voice region when you create a node.
+
+        NodeAlgorithm.by_players returns the node with the fewest players.
+
+        NodeAlgorithm.by_load returns the node with the lowest load score,
+        which weighs players, CPU, frame stats, memory, latency and recent failures.
     """
 
     # We don't have to define anything special for these, since these just serve as flags
     by_ping = auto()
     by_region = auto()
+    by_players = auto()
+    by_load = auto()
 
     def __str__(self) -> str:
         return self.value
\ No newline at end of file
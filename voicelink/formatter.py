@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-import base64, io, abc, struct, dataclasses
+import base64, binascii, io, abc, struct, dataclasses, sys
 
-from typing import Union, BinaryIO, Optional, TYPE_CHECKING
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Union, BinaryIO, Optional, Iterable, List, Mapping, Dict, TYPE_CHECKING
 if TYPE_CHECKING:
     from .objects import Track
 
@@ -25,6 +27,10 @@ _FORMAT_INT = ">i"
 _FORMAT_LONG = ">q"
 _FORMAT_USHORT = ">H"
 
+_STRUCT_INT = struct.Struct(_FORMAT_INT)
+_STRUCT_LONG = struct.Struct(_FORMAT_LONG)
+_STRUCT_USHORT = struct.Struct(_FORMAT_USHORT)
+
 class HasStream(abc.ABC):
     @property
     @abc.abstractmethod
@@ -207,10 +213,123 @@ class TrackEncoder:
 
         stream.commit()
 
-def decode(data: Union[str, bytes]) -> dict:
-    decoded = base64.b64decode(data)
-    stream = MessageInput(io.BytesIO(decoded))
-    return TrackDecoder().decode(stream)
+class DecodeCache:
+    """Bounded LRU cache of decoded track info, keyed by the encoded track.
+       Entries are read-only mappings shared between every caller, so they must not be mutated.
+    """
+
+    def __init__(self, max_entries: int = 10000, intern: bool = True) -> None:
+        self._entries: OrderedDict[str, Mapping] = OrderedDict()
+        self.max_entries: int = max_entries
+        self.intern: bool = intern
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def configure(self, max_entries: int = None, intern: bool = None) -> None:
+        if intern is not None:
+            self.intern = intern
+        if max_entries is not None:
+            self.max_entries = max_entries
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > max(self.max_entries, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def decode(self, data: Union[str, bytes]) -> Mapping:
+        key = data if isinstance(data, str) else data.decode("ascii")
+        if (info := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return info
+
+        self.misses += 1
+        info = _decode_blob(binascii.a2b_base64(key))
+        if self.intern:
+            info["title"] = sys.intern(info["title"])
+            info["author"] = sys.intern(info["author"])
+            info["sourceName"] = sys.intern(info["sourceName"])
+
+        info = MappingProxyType(info)
+        if self.max_entries > 0:
+            self._entries[key] = info
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return info
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def stats(self) -> Dict[str, Union[int, float]]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+decode_cache = DecodeCache()
+
+def decode(data: Union[str, bytes]) -> Mapping:
+    """Decodes an encoded track through the shared decode cache."""
+    return decode_cache.decode(data)
+
+def _decode_blob(raw: bytes) -> dict:
+    """Decodes a raw track message in place, without going through the stream readers."""
+    if not _STRUCT_INT.unpack_from(raw, 0)[0] & 0x3FFFFFFF:
+        raise ValueError("empty stream")
+
+    encoding, errors = UTF8.encoding, UTF8.error_handler
+    version = raw[4]
+
+    end = 7 + (raw[5] << 8 | raw[6])
+    title = raw[7:end].decode(encoding, errors)
+    offset, end = end + 2, end + 2 + (raw[end] << 8 | raw[end + 1])
+    author = raw[offset:end].decode(encoding, errors)
+    length = _STRUCT_LONG.unpack_from(raw, end)[0]
+    offset, end = end + 10, end + 10 + (raw[end + 8] << 8 | raw[end + 9])
+    identifier = raw[offset:end].decode(encoding, errors)
+    is_stream = raw[end] != 0
+    offset = end + 1
+
+    optional = [None, None, None]
+    for index in range(1 + (version in (0, 3)) + (version == 3)):
+        if raw[offset]:
+            offset, end = offset + 3, offset + 3 + (raw[offset + 1] << 8 | raw[offset + 2])
+            optional[index] = raw[offset:end].decode(encoding, errors)
+            offset = end
+        else:
+            offset += 1
+
+    end = offset + 2 + (raw[offset] << 8 | raw[offset + 1])
+    return {
+        "title": title,
+        "author": author,
+        "length": length,
+        "identifier": identifier,
+        "is_stream": is_stream,
+        "uri": optional[0],
+        "artworkUrl": optional[1],
+        "isrc": optional[2],
+        "sourceName": raw[offset + 2:end].decode(encoding, errors),
+        "position": _STRUCT_LONG.unpack_from(raw, end)[0]
+    }
+
+def decode_many(data: Iterable[Union[str, bytes]]) -> List[Mapping]:
+    """Decodes a batch of encoded tracks. The results have the same shape as `decode`."""
+    cached = decode_cache.decode
+    return [cached(blob) for blob in data]
 
 def encode(track) -> bytes:
     buf = io.BytesIO()
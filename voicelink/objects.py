@@ -34,7 +34,7 @@ from function import (
 )
 
 from .spotify import Playlist as spPlaylist
-from .formatter import encode
+from .formatter import encode, decode
 
 YOUTUBE_REGEX = re.compile(r'(https?://)?(www\.)?youtube\.(com|nl)/watch\?v=([-\w]+)')
 
@@ -75,6 +75,10 @@ class Track:
         spotify_track = None,
     ):
         self._track_id: Optional[str] = track_id
+        self.requester: Member = requester
+        self._setup(info, search_type, spotify_track)
+
+    def _setup(self, info: dict, search_type: SearchType, spotify_track) -> None:
         self.info: dict = info
 
         self.identifier: str = info.get("identifier")
@@ -97,7 +101,6 @@ class Track:
         self.emoji: str = get_source(self.source, "emoji")
         self.length: float = 3000 if self.source == "soundcloud" and "/preview/" in self.identifier else info.get("length")
         
-        self.requester: Member = requester
         self.is_stream: bool = info.get("isStream", False)
         self.is_seekable: bool = info.get("isSeekable", True)
         self.position: int = info.get("position", 0)
@@ -117,7 +120,7 @@ class Track:
     def toDict(self) -> dict:
         return {
             "track_id": self.track_id,
-            "info": self.info,
+            "info": dict(self.info),
             "thumbnail": self.thumbnail
         }
 
@@ -131,7 +134,55 @@ class Track:
     @property
     def formatted_length(self) -> str:
         return ctime(self.length)
-    
+
+class LazyTrack(Track):
+    """A track which only keeps its encoded form and requester until another field is read.
+       The info is decoded (or taken from `info`, if given) and every derived field is filled in on first access.
+    """
+
+    __slots__ = ("_loaded",)
+
+    def __init__(
+        self,
+        *,
+        track_id: str,
+        requester: Member,
+        info: Optional[dict] = None,
+        search_type: SearchType = SearchType.ytsearch
+    ):
+        self._loaded: bool = False
+        self._track_id: Optional[str] = track_id
+        self.requester: Member = requester
+        self._search_type: SearchType = search_type
+        if info is not None:
+            self.info = info
+
+    def __getattr__(self, name: str):
+        if self._loaded or name not in Track.__slots__:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+        self._load()
+        return getattr(self, name)
+
+    def _load(self) -> None:
+        self._loaded = True
+
+        preset = {}
+        for slot in Track.__slots__:
+            try:
+                preset[slot] = getattr(self, slot)
+            except AttributeError:
+                pass
+
+        info = preset.pop("info", None) or decode(self._track_id)
+        self._setup(info, preset.pop("_search_type"), preset.pop("spotify_track", None))
+        for slot, value in preset.items():
+            setattr(self, slot, value)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
 class Playlist:
     """The base playlist object.
        Returns critical playlist information needed for parsing by Lavalink.
@@ -173,7 +224,7 @@ class Playlist:
             self._uri = self.spotify_playlist.uri
         else:
             self.tracks = [
-                Track(track_id=track["encoded"], info=track["info"], requester=requester)
+                LazyTrack(track_id=track["encoded"], info=track["info"], requester=requester)
                 for track in self.tracks_raw
             ]
             self._thumbnail = None
@@ -198,3 +249,10 @@ class Playlist:
     @property
     def track_count(self) -> int:
         return len(self.tracks)
+
+    @property
+    def total_tracks(self) -> int:
+        """Tracks in the source playlist, including the pages of a Spotify playlist that are still loading."""
+        if self.spotify_playlist:
+            return max(len(self.tracks), self.spotify_playlist.total_tracks)
+        return len(self.tracks)
@@ -25,11 +25,15 @@ import time
 import function as func
 
 from math import ceil
-from asyncio import sleep
+from asyncio import sleep, gather, current_task, CancelledError, Semaphore, Task
 from views import InteractiveController
 from typing import (
     Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
     Dict,
+    Iterable,
     Optional,
     Union,
     List
@@ -48,13 +52,16 @@ from discord import (
 
 from discord.ext import commands
 from . import events
-from .enums import SearchType, LoopType
+from .enums import SearchType, LoopType, NodeAlgorithm
 from .events import VoicelinkEvent, TrackEndEvent, TrackStartEvent
-from .exceptions import VoicelinkException, FilterInvalidArgument, TrackInvalidPosition, TrackLoadError, FilterTagAlreadyInUse, DuplicateTrack
+from .exceptions import VoicelinkException, FilterInvalidArgument, TrackInvalidPosition, TrackLoadError, FilterTagAlreadyInUse, DuplicateTrack, QueueFull
 from .filters import Filter, Filters
 from .objects import Track, Playlist
 from .pool import Node, NodePool
-from .queue import Queue, FairQueue
+from .utils import LatencyStats
+from .regions import voice_region
+from .queue import Queue, FairQueue, RoundRobinQueue
+from .storage import get_storage
 from .placeholders import Placeholders, build_embed
 from random import shuffle, choice
 
@@ -91,6 +98,14 @@ class Player(VoiceProtocol):
        ```
     """
 
+    IPC_ADD_BATCH: int = 100
+    PREFETCH_TRACKS: int = 3
+    PREFETCH_CONCURRENCY: int = 2
+
+    # Time from a track ending to the next PATCH being sent, and to Lavalink starting it, shared by all players.
+    transition_stats: LatencyStats = LatencyStats()
+    dispatch_stats: LatencyStats = LatencyStats()
+
     def __call__(self, client: Client, channel: VoiceChannel):
         self.client: Client = client
         self.channel: VoiceChannel = channel
@@ -117,7 +132,14 @@ class Player(VoiceProtocol):
         self.joinTime: float = round(time.time())
         self._volume: int = self.settings.get('volume', 100)
         self.queue: Queue = eval(self.settings.get("queueType", "Queue"))(self.settings.get(
-            "maxQueue", func.settings.max_queue), self.settings.get("duplicateTrack", True), self.get_msg)
+            "maxQueue", func.settings.max_queue), self.settings.get("duplicateTrack", True), self.get_msg,
+            get_storage(func.settings.queue_storage))
+        self.queue.on_change = self._on_queue_change
+        self._prefetch_task: Optional[Task] = None
+        self._prefetch_scheduled: bool = False
+        self._background_tasks: set[Task] = set()
+        self._history_tasks: set[Task] = set()
+        self._track_ended_at: Optional[float] = None
 
         self._node = NodePool.get_node()
         self._current: Track = None
@@ -133,9 +155,11 @@ class Player(VoiceProtocol):
         self._ending_track: Optional[Track] = None
 
         self._voice_state: dict = {}
+        self._voice_region: Optional[str] = None
 
         self.controller: Message = None
         self.updating: bool = False
+        self._controller_dirty: bool = False
 
         self.pause_votes = set()
         self.resume_votes = set()
@@ -146,6 +170,10 @@ class Player(VoiceProtocol):
 
         self.ph = Placeholders(client, self)
 
+        # Pinned last so a failing __init__ can't leave a pin behind, teardown unpins it
+        if self._guild:
+            func.SETTINGS_BUFFER.pin(self._guild.id)
+
     def __repr__(self):
         return (
             f"<Voicelink.player bot={self.bot} guildId={self.guild.id} "
@@ -292,9 +320,31 @@ class Player(VoiceProtocol):
         )
 
     async def on_voice_server_update(self, data: dict):
+        had_voice = "event" in self._voice_state
         self._voice_state.update({"event": data})
+        self._voice_region = voice_region(data.get("endpoint"))
+
+        if not self._current:
+            # Nothing is playing yet, so moving to the node closest to the voice server is free
+            try:
+                node = NodePool.get_best_node(algorithm=NodeAlgorithm.by_region, region=self._voice_region)
+            except:
+                node = self._node
+            if node is not self._node:
+                await self._move_to(node, destroy=had_voice)
+
         await self._dispatch_voice_update(self._voice_state)
 
+    async def _move_to(self, node: Node, destroy: bool = True) -> None:
+        old_node, self._node = self._node, node
+        old_node._players.pop(self.guild.id, None)
+        node._players[self.guild.id] = self
+        if destroy:
+            try:
+                await old_node.send(method=1, guild_id=self._guild.id)
+            except:
+                pass
+
     async def on_voice_state_update(self, data: dict):
         self._voice_state.update({"sessionId": data.get("session_id")})
 
@@ -316,11 +366,22 @@ class Player(VoiceProtocol):
 
         if isinstance(event, TrackEndEvent) and event.reason != "replaced":
             self._current = None
+            self._track_ended_at = time.perf_counter()
 
         event.dispatch(self._bot)
 
         if isinstance(event, TrackStartEvent):
             self._ending_track = self._current
+            if self._track_ended_at:
+                self.transition_stats.add((time.perf_counter() - self._track_ended_at) * 1000)
+                self._track_ended_at = None
+
+    def _run_in_background(self, coro, *, tasks: Optional[set[Task]] = None) -> None:
+        """Runs work that doesn't affect playback off the track transition path."""
+        tasks = self._background_tasks if tasks is None else tasks
+        task = self._bot.loop.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
 
     async def do_next(self):
         if self.is_playing or not self.channel:
@@ -348,6 +409,7 @@ class Player(VoiceProtocol):
         if not track:
             if self.settings.get("autoplay", False) and await self.get_recommendations():
                 return await self.do_next()
+            self._track_ended_at = None
         else:
             try:
                 await self.play(track, start=track.position)
@@ -355,28 +417,43 @@ class Player(VoiceProtocol):
                 await sleep(5)
                 return await self.do_next()
 
+            if self._track_ended_at:
+                self.dispatch_stats.add((time.perf_counter() - self._track_ended_at) * 1000)
+
             if not track.requester.bot:
-                await func.update_user(track.requester.id, {
-                    "$push": {"history": {"$each": [track.track_id], "$slice": -25}}
-                })
+                self._run_in_background(func.HISTORY_BUFFER.push(track.requester.id, track.track_id), tasks=self._history_tasks)
 
         if self.settings.get('controller', True):
-            await self.invoke_controller()
+            self._run_in_background(self.invoke_controller())
 
         if self.is_ipc_connected:
-            await self.send_ws({
+            self._run_in_background(self.send_ws({
                 "op": "trackUpdate",
                 "current_queue_position": self.queue._position if track else self.queue._position + 1,
                 "track_id": track.track_id if track else None,
                 "is_paused": self._paused
-            })
+            }))
 
     async def invoke_controller(self):
-        if self.updating or not self.channel:
+        if not self.channel:
+            return
+
+        # A refresh is already running, let it run once more when it is done so it shows the latest track
+        if self.updating:
+            self._controller_dirty = True
             return
 
         self.updating = True
+        try:
+            while True:
+                self._controller_dirty = False
+                await self._refresh_controller()
+                if not self._controller_dirty:
+                    break
+        finally:
+            self.updating = False
 
+    async def _refresh_controller(self):
         if not self.controller:
             try:
                 self.controller = await self.context.channel.send(embed=await self.build_embed(), view=InteractiveController(self))
@@ -400,8 +477,6 @@ class Player(VoiceProtocol):
                 except:
                     pass
 
-        self.updating = False
-
     async def build_embed(self):
         controller = self.settings.get(
             "default_controller", func.settings.controller).get("embeds", {})
@@ -431,6 +506,20 @@ class Player(VoiceProtocol):
         if self.is_ipc_connected:
             await self.send_ws({"op": "playerClose"})
 
+        self.queue.on_change = None
+        if self._prefetch_task:
+            self._prefetch_task.cancel()
+        func.SETTINGS_BUFFER.unpin(self.guild.id)
+
+        # History pushes are allowed to finish, everything else (e.g. a controller refresh still in flight
+        # that could post a new message after this) is cancelled
+        if self._history_tasks:
+            await gather(*self._history_tasks, return_exceptions=True)
+        if tasks := [task for task in self._background_tasks if task is not current_task()]:
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+
         try:
             await self.controller.delete()
         except:
@@ -459,6 +548,16 @@ class Player(VoiceProtocol):
         """
         return await self._node.get_tracks(query, requester=requester, search_type=search_type)
 
+    def iter_tracks(
+        self,
+        query: str,
+        *,
+        requester: Member,
+        search_type: SearchType = SearchType.ytsearch
+    ) -> AsyncIterator[Union[List[Track], Playlist]]:
+        """Streams the result of `get_tracks` in batches. See `Node.iter_tracks`."""
+        return self._node.iter_tracks(query, requester=requester, search_type=search_type)
+
     async def connect(self, *, timeout: float, reconnect: bool, self_deaf: bool = True, self_mute: bool = False):
         await self.guild.change_voice_state(channel=self.channel, self_deaf=True, self_mute=self_mute)
         self._node._players[self.guild.id] = self
@@ -503,17 +602,8 @@ class Player(VoiceProtocol):
         if not self._node:
             return track
 
-        if track.spotify:
-            if not track.original:
-                search: Track = (await self._node.get_tracks(
-                    f"ytsearch:{track.author} - {track.title}",
-                    requester=track.requester
-                ))
-
-                if not search:
-                    raise TrackLoadError("Can't not found a playable source!")
-
-                track.original = search[0]
+        if track.spotify and not track.original:
+            await self._resolve(track)
 
         data = {
             "encodedTrack": track.original.track_id if track.original else track.track_id,
@@ -536,33 +626,136 @@ class Player(VoiceProtocol):
 
         return self._current
 
-    async def add_track(self, raw_tracks: Union[Track, List[Track]], *, at_font: bool = False, duplicate: bool = True) -> int:
-        tracks = []
+    async def add_track(self, raw_tracks: Union[Track, Iterable[Track]], *, at_font: bool = False, duplicate: bool = True) -> int:
+        unique = not (self.queue._allow_duplicate and duplicate)
+
+        if isinstance(raw_tracks, Track):
+            if unique and self.queue.is_duplicate(raw_tracks):
+                raise DuplicateTrack(
+                    self.get_msg("voicelinkDuplicateTrack"))
+
+            position = self.queue.put_at_front(
+                raw_tracks) if at_font else self.queue.put(raw_tracks)
+            tracks = [raw_tracks]
+        else:
+            tracks = self.queue.extend(raw_tracks, at_front=at_font, unique=unique)
+            position = len(tracks)
 
-        _duplicate_tracks = () if self.queue._allow_duplicate and duplicate else (
-            track.uri for track in self.queue._queue)
+        await self._notify_added(tracks)
+        return position
 
+    async def ingest(
+        self,
+        tracks: Iterable[Track],
+        batches: AsyncIterator[List[Track]],
+        *,
+        duplicate: bool = True,
+        on_error: Optional[Callable[[Exception, int], Awaitable[None]]] = None
+    ) -> int:
+        """Adds `tracks` and starts playing if the player is idle, then keeps adding every further batch
+           in the background as it arrives. Returns the number of tracks added right away.
+           The player owns `batches` from here on. If a batch fails to load or only partly fits into
+           the queue, loading stops and `on_error(error, added)` is awaited with the number of tracks added in total.
+           IPC notifications are sent in chunks of at least `IPC_ADD_BATCH` tracks.
+        """
+        unique = not (self.queue._allow_duplicate and duplicate)
         try:
-            if (isList := isinstance(raw_tracks, List)):
-                for track in raw_tracks:
-                    if track.uri in _duplicate_tracks:
-                        continue
-                    self.queue.put_at_front(
-                        track) if at_font else self.queue.put(track)
-                    tracks.append(track)
-            else:
-                if raw_tracks.uri in _duplicate_tracks:
-                    raise DuplicateTrack(
-                        self.get_msg("voicelinkDuplicateTrack"))
+            tracks = list(tracks)
+            added = self.queue.extend(tracks, unique=unique)
+            overflow = self._overflowed(tracks, added)
+            await self._notify_added(added)
 
-                position = self.queue.put_at_front(
-                    raw_tracks) if at_font else self.queue.put(raw_tracks)
-                tracks.append(raw_tracks)
+            if not self.is_playing:
+                await self.do_next()
+        except:
+            await batches.aclose()
+            raise
+
+        self._run_in_background(self._ingest_batches(batches, unique, len(added), on_error, overflow))
+        return len(added)
+
+    def _overflowed(self, tracks: List[Track], added: List[Track]) -> bool:
+        """Whether `extend` dropped tracks because the queue is full, not because they were duplicates."""
+        return len(added) < len(tracks) and self.queue.count >= self.queue._size
+
+    async def _ingest_batches(
+        self,
+        batches: AsyncIterator[List[Track]],
+        unique: bool,
+        added: int,
+        on_error: Optional[Callable[[Exception, int], Awaitable[None]]],
+        overflow: bool = False
+    ) -> None:
+        pending: List[Track] = []
+        try:
+            if not overflow:
+                async for batch in batches:
+                    tracks = self.queue.extend(batch, unique=unique)
+                    added += len(tracks)
+                    pending += tracks
+                    if overflow := self._overflowed(batch, tracks):
+                        break
+                    if len(pending) >= self.IPC_ADD_BATCH:
+                        await self._notify_added(pending)
+                        pending.clear()
+
+            if overflow:
+                raise QueueFull(self.get_msg("voicelinkQueueFull").format(self.queue._size))
+        except CancelledError:
+            raise
+        except Exception as e:
+            if on_error:
+                try:
+                    await on_error(e, added)
+                except:
+                    pass
         finally:
-            if tracks:
-                if self.is_ipc_connected:
-                    await self.send_ws({"op": "addTrack", "tracks": [track.track_id for track in tracks]}, tracks[0].requester)
-                return len(tracks) if isList else position
+            await batches.aclose()
+            await self._notify_added(pending)
+
+    async def _notify_added(self, tracks: List[Track]) -> None:
+        if tracks and self.is_ipc_connected:
+            await self.send_ws({"op": "addTrack", "tracks": [track.track_id for track in tracks]}, tracks[0].requester)
+
+    async def _resolve(self, track: Track) -> Track:
+        """Finds a playable source for a Spotify track and stores it as the track's original."""
+        search: Track = (await self._node.get_tracks(
+            f"ytsearch:{track.author} - {track.title}",
+            requester=track.requester
+        ))
+
+        if not search:
+            raise TrackLoadError("Can't not found a playable source!")
+
+        track.original = search[0]
+        if self._node._pool._spotify_cache:
+            await self._node._pool._spotify_cache.put_resolved(track.identifier, track.original.track_id)
+        return track.original
+
+    def _on_queue_change(self) -> None:
+        if not self._prefetch_scheduled:
+            self._prefetch_scheduled = True
+            self._bot.loop.call_soon(self._schedule_prefetch)
+
+    def _schedule_prefetch(self) -> None:
+        """Restarts the prefetch worker for the current upcoming tracks, dropping lookups that are no longer needed."""
+        self._prefetch_scheduled = False
+        if self._prefetch_task and not self._prefetch_task.done():
+            self._prefetch_task.cancel()
+
+        upcoming = [track for track in self.queue.peek(self.PREFETCH_TRACKS) if track.spotify and not track.original]
+        self._prefetch_task = self._bot.loop.create_task(self._prefetch(upcoming)) if upcoming and self._node else None
+
+    async def _prefetch(self, tracks: List[Track]) -> None:
+        """Resolves the given Spotify tracks ahead of time so `play` doesn't have to search for them."""
+        semaphore = Semaphore(self.PREFETCH_CONCURRENCY)
+
+        async def resolve(track: Track) -> None:
+            async with semaphore:
+                if not track.original:
+                    await self._resolve(track)
+
+        await gather(*(resolve(track) for track in tracks), return_exceptions=True)
 
     async def seek(self, position: float, requester: Member = None) -> float:
         """Seeks to a position in the currently playing track milliseconds"""
@@ -602,7 +795,7 @@ class Player(VoiceProtocol):
         if self.is_ipc_connected:
             await self.send_ws({
                 "op": "shuffleTrack",
-                "tracks": [track.track_id for track in self.queue._queue],
+                "tracks": [track.track_id for track in self.queue.history(incTrack=True) + self.queue.tracks()],
                 "verified": {
                     "index": self.queue._position if queue_type == "queue" else 0,
                     "track_id": replacement[0].track_id,
@@ -664,21 +857,38 @@ class Player(VoiceProtocol):
         except:
             return await self.teardown()
 
-        self._node._players.pop(self.guild.id)
-        self._node = node
-        self._node._players[self.guild.id] = self
-
-        await self._dispatch_voice_update(self._voice_state)
-
-        if self.current:
-            await self.play(self.current, start=self.position)
-            self._last_update = time.time() * 1000
+        await self.migrate(node)
+
+    def _state_payload(self, position: float) -> Dict[str, Any]:
+        data = {"volume": self._volume, "paused": self._paused, "filters": self._filters.get_all_payloads()}
+        if {"sessionId", "event"} == self._voice_state.keys():
+            data["voice"] = {
+                "token": self._voice_state['event']['token'],
+                "endpoint": self._voice_state['event']['endpoint'],
+                "sessionId": self._voice_state['sessionId'],
+            }
+        if self._current:
+            data["encodedTrack"] = (self._current.original or self._current).track_id
+            data["position"] = int(position)
+        return data
+
+    async def migrate(self, node: Node) -> bool:
+        """Moves the player to another node while it keeps playing.
+           The new node gets the voice connection, track, position, pause state, volume and filters
+           in a single update before the old node lets go of the player.
+        """
+        if node is self._node:
+            return True
 
-            if self.is_paused:
-                await self.set_pause(True)
+        position = self.position if self._current else 0
+        try:
+            await node.send(method=0, guild_id=self._guild.id, data=self._state_payload(position))
+        except:
+            return False
 
-        if self.volume != 100:
-            await self.set_volume(self.volume)
+        self._last_position, self._last_update = position, time.time() * 1000
+        await self._move_to(node)
+        return True
 
     async def get_recommendations(self, *, track: Track = None) -> bool:
         """Get recommendations from Youtube or Spotify."""
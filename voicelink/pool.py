@@ -24,13 +24,16 @@ SOFTWARE.
 from __future__ import annotations
 
 import asyncio
+import json
 import os
 import re
+import time
 import aiohttp
 
+from collections import OrderedDict
 from discord import Client, Member
 from discord.ext.commands import Bot
-from typing import Dict, Optional, TYPE_CHECKING, Union, List
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, TYPE_CHECKING, Tuple, Union, List
 from urllib.parse import quote
 
 from . import (
@@ -48,8 +51,9 @@ from .exceptions import (
     NoNodesAvailable,
     TrackLoadError
 )
-from .objects import Playlist, Track
-from .utils import ExponentialBackoff, NodeStats, Ping
+from .objects import Playlist, Track, LazyTrack
+from .regions import region_location, distance
+from .utils import ExponentialBackoff, NodeStats, ProbeStats, RateLimiter, SingleFlight
 
 if TYPE_CHECKING:
     from .player import Player
@@ -68,14 +72,184 @@ URL_REGEX = re.compile(
 )
 
 NODE_VERSION = "v4"
+
+# Nodes at most this many kilometers further away than the closest one are treated as equally close
+REGION_TOLERANCE_KM = 1500
 CALL_METHOD = ["PATCH", "DELETE"]
 
+# Seconds a Lavalink load result stays cached, by its loadType
+CACHE_TTLS: Dict[str, float] = {
+    "search": 300,
+    "track": 6 * 3600,
+    "playlist": 1800,
+    "empty": 60,
+    "error": 0
+}
+
+class TrackCache:
+    """A bounded LRU cache for Lavalink load results.
+       Entries expire by their load type, the summed size of the cached responses is
+       kept under `max_bytes` and concurrent loads of the same key share one request.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 5000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttls: Optional[Dict[str, float]] = None
+    ) -> None:
+        self._entries: OrderedDict[Tuple[str, str], Tuple[float, int, dict]] = OrderedDict()
+        self._inflight: SingleFlight = SingleFlight()
+        self._max_entries: int = max_entries
+        self._max_bytes: int = max_bytes
+        self._ttls: Dict[str, float] = {**CACHE_TTLS, **(ttls or {})}
+
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __repr__(self) -> str:
+        return f"<Voicelink.TrackCache entries={len(self._entries)} size={self.size}>"
+
+    @staticmethod
+    def make_key(query: str, search_type: SearchType) -> Tuple[str, str]:
+        query = query.strip()
+        if not URL_REGEX.match(query):
+            query = " ".join(query.lower().split())
+        return str(search_type), query
+
+    def _pop(self, key: Tuple[str, str]) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def get(self, key: Tuple[str, str]) -> Optional[dict]:
+        if not (entry := self._entries.get(key)):
+            return None
+
+        if entry[0] < time.monotonic():
+            self._pop(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def put(self, key: Tuple[str, str], data: dict, size: int) -> None:
+        ttl = self._ttls.get(data.get("loadType"), 0)
+        if ttl <= 0 or size > self._max_bytes:
+            return
+
+        if key in self._entries:
+            self._pop(key)
+
+        self._entries[key] = (time.monotonic() + ttl, size, data)
+        self.size += size
+
+        while len(self._entries) > self._max_entries or self.size > self._max_bytes:
+            _, (_, evicted, _) = self._entries.popitem(last=False)
+            self.size -= evicted
+            self.evictions += 1
+
+    async def load(self, key: Tuple[str, str], loader: Callable[[], Awaitable[Tuple[dict, int]]]) -> dict:
+        """Returns the cached result for the key, or awaits `loader` once for all concurrent callers."""
+        if (data := self.get(key)) is not None:
+            self.hits += 1
+            return data
+
+        async def fetch() -> dict:
+            self.misses += 1
+            data, size = await loader()
+            self.put(key, data, size)
+            return data
+
+        return await self._inflight.run(key, fetch)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    @property
+    def stats(self) -> Dict[str, Union[int, float]]:
+        coalesced = self._inflight.coalesced
+        lookups = self.hits + self.misses + coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + coalesced) / lookups, 3) if lookups else 0.0
+        }
+
+class LoadScore:
+    """Scores how loaded a node is, lower is better. One point is roughly one playing player.
+       CPU and frame penalties grow exponentially so a struggling node is avoided long before
+       it is full, and failures add a penalty which halves every `failure_half_life` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        players: float = 1.0,
+        cpu: float = 1.0,
+        frames: float = 1.0,
+        memory: float = 1.0,
+        latency: float = 0.1,
+        failure: float = 100.0,
+        failure_half_life: float = 120.0
+    ) -> None:
+        self.players: float = players
+        self.cpu: float = cpu
+        self.frames: float = frames
+        self.memory: float = memory
+        self.latency: float = latency
+        self.failure: float = failure
+        self.failure_half_life: float = failure_half_life
+
+    def failure_penalty(self, node: Node) -> float:
+        if not node._failure_penalty:
+            return 0.0
+        elapsed = time.monotonic() - node._failure_at
+        return node._failure_penalty * 0.5 ** (elapsed / self.failure_half_life)
+
+    def breakdown(self, node: Node) -> Dict[str, float]:
+        stats: Optional[NodeStats] = node._stats
+        playing = sum(1 for player in node._players.values() if player.is_playing)
+        if stats and stats.players_active:
+            # Lavalink also counts players of other clients sharing the node
+            playing = max(playing, stats.players_active)
+        scores = {"players": playing * self.players, "cpu": 0.0, "frames": 0.0, "memory": 0.0}
+
+        if stats:
+            scores["cpu"] = (1.05 ** (100 * (stats.cpu_process_load or 0)) * 10 - 10) * self.cpu
+            scores["frames"] = (
+                (1.03 ** (500 * stats.frames_deficit / 3000) * 600 - 600) +
+                (1.03 ** (500 * stats.frames_nulled / 3000) * 300 - 300)
+            ) * self.frames
+            if stats.reservable:
+                usage = stats.used / stats.reservable
+                scores["memory"] = max(0.0, usage - 0.7) / 0.3 * 200 * self.memory
+
+        latency = node._probe.latency
+        scores["latency"] = (latency if latency != float("inf") else 1000) * self.latency
+        scores["failures"] = self.failure_penalty(node)
+        return scores
+
+    def score(self, node: Node) -> float:
+        return sum(self.breakdown(node).values())
+
 class Node:
     """The base class for a node. 
        This node object represents a Lavalink node. 
        To enable Spotify searching, pass in a proper Spotify Client ID and Spotify Client Secret
     """
 
+    # Seconds between two latency probes and how long a probe may take
+    PROBE_INTERVAL: float = 30.0
+    PROBE_TIMEOUT: float = 5.0
+
     def __init__(
         self,
         *,
@@ -90,7 +264,11 @@ class Node:
         session: Optional[aiohttp.ClientSession] = None,
         spotify_client_id: Optional[str] = None,
         spotify_client_secret: Optional[str] = None,
-        resume_key: Optional[str] = None
+        resume_key: Optional[str] = None,
+        resume_timeout: int = 60,
+        restore_concurrency: int = 5,
+        restore_rate: float = 10.0,
+        regions: Optional[List[str]] = None
 
     ):
         self._bot: Bot = bot
@@ -101,6 +279,10 @@ class Node:
         self._identifier: str = identifier
         self._heartbeat: int = heartbeat
         self._secure: bool = secure
+        self._regions: List[str] = [region.lower() for region in regions or []]
+        self._locations: List[Tuple[float, float]] = [
+            location for region in self._regions if (location := region_location(region))
+        ]
        
         self._websocket_uri: str = f"{'wss' if self._secure else 'ws'}://{self._host}:{self._port}/" + NODE_VERSION + "/websocket"
         self._rest_uri: str = f"{'https' if self._secure else 'http'}://{self._host}:{self._port}"
@@ -109,18 +291,28 @@ class Node:
         self._websocket: aiohttp.ClientWebSocketResponse = None
         self._task: asyncio.Task = None
 
+        # Lavalink v4 resumes by session id, the key is only kept for compatibility
         self.resume_key: str = resume_key or str(os.urandom(8).hex())
+        self._resume_timeout: int = resume_timeout
         self._session_id: str = None
         self._available: bool = None
 
         self._headers: Dict[str, str] = {
             "Authorization": self._password,
             "User-Id": str(bot.user.id),
-            "Client-Name": f"Voicelink/{__version__}",
-            'Resume-Key': self.resume_key
+            "Client-Name": f"Voicelink/{__version__}"
         }
 
         self._players: Dict[int, Player] = {}
+        self._inflight: SingleFlight = SingleFlight()
+        self._probe: ProbeStats = ProbeStats()
+        self._probe_task: Optional[asyncio.Task] = None
+        self._stats: Optional[NodeStats] = None
+        self._failure_penalty: float = 0.0
+        self._failure_at: float = 0.0
+        self._draining: bool = False
+        self._restore_limiter: RateLimiter = RateLimiter(restore_concurrency, restore_rate)
+        self._restore_task: Optional[asyncio.Task] = None
 
         self._spotify_client_id: Optional[str] = spotify_client_id
         self._spotify_client_secret: Optional[str] = spotify_client_secret
@@ -141,7 +333,7 @@ class Node:
                 return None
             
             self._spotify_client = spotify.Client(
-                self._spotify_client_id, self._spotify_client_secret
+                self._spotify_client_id, self._spotify_client_secret, cache=self._pool._spotify_cache
             )
 
         return self._spotify_client
@@ -179,8 +371,74 @@ class Node:
 
     @property
     def latency(self) -> float:
-        """Property which returns the latency of the node"""
-        return Ping(self._host, port=self._port).get_ping()
+        """Property which returns the latency of the node, as last measured by the background prober"""
+        return self._probe.latency
+
+    @property
+    def probe_stats(self) -> ProbeStats:
+        """Property which returns the round trip history of the node"""
+        return self._probe
+
+    @property
+    def is_draining(self) -> bool:
+        """Property which returns whether this node is being emptied and takes no new players"""
+        return self._draining
+
+    @property
+    def regions(self) -> List[str]:
+        """Property which returns the voice regions this node is meant to serve"""
+        return self._regions
+
+    def distance_to(self, location: Tuple[float, float]) -> float:
+        """Returns the distance in kilometers between the closest region of this node and a location."""
+        if not self._locations:
+            return float("inf")
+        return min(distance(location, own) for own in self._locations)
+
+    @property
+    def load_score(self) -> float:
+        """Property which returns the load score of the node, lower is better"""
+        return self._pool._load_score.score(self)
+
+    def record_failure(self, weight: float = 1.0) -> None:
+        """Penalizes the node in load based selection, the penalty decays over time."""
+        self._failure_penalty = self._pool._load_score.failure_penalty(self) + self._pool._load_score.failure * weight
+        self._failure_at = time.monotonic()
+
+    async def probe(self) -> None:
+        """Measures the TCP connect time and the REST round trip of the node once."""
+        try:
+            start = time.perf_counter()
+            _, writer = await asyncio.wait_for(asyncio.open_connection(self._host, int(self._port)), self.PROBE_TIMEOUT)
+            tcp = (time.perf_counter() - start) * 1000
+            writer.close()
+            await asyncio.wait_for(writer.wait_closed(), self.PROBE_TIMEOUT)
+
+            start = time.perf_counter()
+            async with self._session.get(
+                f"{self._rest_uri}/version",
+                headers={"Authorization": self._password},
+                timeout=aiohttp.ClientTimeout(total=self.PROBE_TIMEOUT)
+            ) as resp:
+                await resp.read()
+            rest = (time.perf_counter() - start) * 1000 if resp.status < 300 else None
+        except (OSError, asyncio.TimeoutError, aiohttp.ClientError):
+            self.record_failure(0.5)
+            return self._probe.fail()
+
+        self._probe.add(tcp, rest)
+
+    async def _probe_loop(self) -> None:
+        while True:
+            try:
+                await self.probe()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Count it as a failed probe so the node doesn't keep its last latency forever
+                print(f"Failed to probe {self._identifier} (Reason: {e})")
+                self._probe.fail()
+            await asyncio.sleep(self.PROBE_INTERVAL)
 
     async def _update_handler(self, data: dict) -> None:
         #await self._bot.wait_until_ready()
@@ -217,6 +475,7 @@ class Node:
                 break
             if msg.type == aiohttp.WSMsgType.CLOSED:
                 self._available = False
+                self.record_failure()
 
                 retry = backoff.delay()
                 print(f"Trying to reconnect {self._identifier} with {round(retry)}s")
@@ -236,6 +495,8 @@ class Node:
 
         if op == "ready":
             self._session_id = data.get("sessionId")
+            await self._on_ready(data.get("resumed", False))
+            return
 
         if op == "stats":
             self._stats = NodeStats(data)
@@ -271,6 +532,8 @@ class Node:
             json=data
         ) as resp:
             if resp.status >= 300:
+                if resp.status >= 500:
+                    self.record_failure(0.2)
                 raise NodeException(f"Getting errors from Lavalink REST api")
             
             if method == CALL_METHOD[1]:
@@ -286,12 +549,18 @@ class Node:
         """Initiates a connection with a Lavalink node and adds it to the node pool."""
 
         try:
+            headers = self._headers.copy()
+            if self._session_id and self._resume_timeout:
+                headers["Session-Id"] = self._session_id
+
             self._websocket = await self._session.ws_connect(
-                self._websocket_uri, headers=self._headers, heartbeat=self._heartbeat
+                self._websocket_uri, headers=headers, heartbeat=self._heartbeat
             )
 
             self._task = self._bot.loop.create_task(self._listen())
             self._available = True
+            if not self._probe_task or self._probe_task.done():
+                self._probe_task = self._bot.loop.create_task(self._probe_loop())
 
             print(f"{self._identifier} is connected!")
         
@@ -307,9 +576,6 @@ class Node:
             raise NodeConnectionFailure(
                 f"The URI for node '{self._identifier}' is invalid."
             )
-        
-        if self.players:
-            await self.reconnect()
 
         return self
               
@@ -327,22 +593,62 @@ class Node:
         del self._pool._nodes[self._identifier]
         self._available = False
         self._task.cancel()
+        if self._probe_task:
+            self._probe_task.cancel()
+        if self._restore_task:
+            self._restore_task.cancel()
 
-    async def reconnect(self) -> None:
-        await asyncio.sleep(10)
-        for player in self.players.copy().values():
+    async def _on_ready(self, resumed: bool) -> None:
+        if self._resume_timeout:
             try:
-                if player._voice_state:
-                    await player._dispatch_voice_update(player._voice_state)
+                async with self._session.patch(
+                    f"{self._rest_uri}/{NODE_VERSION}/sessions/{self._session_id}",
+                    headers={"Authorization": self._password},
+                    json={"resuming": True, "timeout": self._resume_timeout}
+                ) as resp:
+                    if resp.status >= 300:
+                        print(f"{self._identifier} refused session resuming ({resp.status})")
+            except:
+                pass
+
+        # Lavalink kept the players of a resumed session playing, there is nothing to restore
+        if resumed:
+            print(f"{self._identifier} resumed its session with {len(self._players)} players")
+            return
+
+        if self._players:
+            if self._restore_task and not self._restore_task.done():
+                self._restore_task.cancel()
+            self._restore_task = self._bot.loop.create_task(self.reconnect())
+
+    @staticmethod
+    def _restore_priority(player: Player) -> Tuple[int, int]:
+        listeners = len(player.channel.members) if player.channel else 0
+        return (0 if player.is_playing and not player._paused else 1 if player._current else 2, -listeners)
 
-                if player.current:
-                    await player.play(track=player.current, start=min(player._last_position, player.current.length))
+    async def _restore_player(self, player: Player) -> bool:
+        async with self._restore_limiter:
+            if player._node is not self or not (player._voice_state or player._current):
+                return True
 
-                    if player.is_paused:
-                        await player.set_pause(True)
+            position = min(player._last_position, player._current.length) if player._current else 0
+            try:
+                await self.send(method=0, guild_id=player._guild.id, data=player._state_payload(position))
             except:
                 await player.teardown()
-            await asyncio.sleep(2)
+                return False
+
+            player._last_position, player._last_update = position, time.time() * 1000
+            return True
+
+    async def reconnect(self) -> None:
+        """Restores every player on a fresh Lavalink session.
+           Playing players go first, then paused ones, each ordered by listener count.
+        """
+        players = sorted(self._players.values(), key=self._restore_priority)
+        start = time.perf_counter()
+        results = await asyncio.gather(*[self._restore_player(player) for player in players])
+        print(f"Restored {sum(results)}/{len(results)} players on {self._identifier} in {time.perf_counter() - start:.1f}s")
 
     async def build_track(
         self,
@@ -356,6 +662,10 @@ class Node:
         Context object on the track it builds.
         """
 
+        data: dict = await self._inflight.run(("decodetrack", identifier), lambda: self._decode_track(identifier))
+        return Track(track_id=identifier, info=data.get("info", data), requester=requester)
+
+    async def _decode_track(self, identifier: str) -> dict:
         async with self._session.get(
             f"{self._rest_uri}/" + NODE_VERSION + "/decodetrack?",
             headers={"Authorization": self._password},
@@ -366,8 +676,16 @@ class Node:
                     f"Failed to build track. Check if the identifier is correct and try again."
                 )
 
-            data: dict = await resp.json()
-            return Track(track_id=identifier, info=data, requester=requester)
+            return await resp.json()
+
+    async def _fetch_tracks(self, query: str) -> Tuple[dict, int]:
+        async with self._session.get(
+            url=f"{self._rest_uri}/" + NODE_VERSION + f"/loadtracks?identifier={quote(query)}",
+            headers={"Authorization": self._password}
+        ) as response:
+            body = await response.read()
+
+        return json.loads(body), len(body)
 
     async def get_tracks(
         self,
@@ -397,45 +715,16 @@ class Node:
                     "please obtain Spotify API credentials here: https://developer.spotify.com/"
                 )
 
-                spotify_results = await self.spotify_client.search(query=query)
+                spotify_results = await self._inflight.run(
+                    ("spotify", query), lambda: self.spotify_client.search(query=query)
+                )
             except Exception as _:
                 raise TrackLoadError("Not able to find the provided Spotify entity, is it private?")
-                
-            if isinstance(spotify_results, spotify.Track):
-                return [
-                    Track(
-                        track_id=None,
-                        info=spotify_results.to_dict(),
-                        requester=requester,
-                        search_type=search_type,
-                        spotify_track=spotify_results,
-                    )
-                ]
-
-            tracks = [
-                Track(
-                    track_id=None,
-                    info=track.to_dict(),
-                    requester=requester,
-                    search_type=search_type,
-                    spotify_track=track,
-                ) for track in spotify_results.tracks if track.uri
-            ]
 
-            return Playlist(
-                playlist_info={"name": spotify_results.name, "selectedTrack": 0},
-                tracks=tracks,
-                requester=requester,
-                spotify=True,
-                spotify_playlist=spotify_results
-            )
+            return await self._from_spotify(spotify_results, requester=requester, search_type=search_type)
 
         elif DISCORD_MP3_URL_REGEX.match(query):
-            async with self._session.get(
-                url=f"{self._rest_uri}/" + NODE_VERSION + f"/loadtracks?identifier={quote(query)}",
-                headers={"Authorization": self._password}
-            ) as response:
-                data: dict = await response.json()
+            data, _ = await self._inflight.run(("loadtracks", query), lambda: self._fetch_tracks(query))
 
             try:
                 track: dict = data["data"]
@@ -450,11 +739,10 @@ class Node:
                 )
             ]
         else:
-            async with self._session.get(
-                url=f"{self._rest_uri}/" + NODE_VERSION + f"/loadtracks?identifier={quote(query)}",
-                headers={"Authorization": self._password}
-            ) as response:
-                data = await response.json()
+            data = await self._pool._track_cache.load(
+                TrackCache.make_key(query, search_type),
+                lambda: self._fetch_tracks(query)
+            )
 
         load_type = data.get("loadType")
 
@@ -497,6 +785,76 @@ class Node:
                 )
             ]
     
+    async def iter_tracks(
+        self,
+        query: str,
+        *,
+        requester: Member,
+        search_type: SearchType = SearchType.ytsearch
+    ) -> AsyncIterator[Union[List[Track], Playlist]]:
+        """Same as `get_tracks`, but a Spotify playlist is yielded as soon as its first page is loaded,
+           followed by a list with the tracks of every further page while the rest are still loading.
+           Any other query yields its `get_tracks` result once.
+        """
+        match = SPOTIFY_URL_REGEX.match(query)
+        if not match or match.group("type") != "playlist" or not self.spotify_client:
+            yield await self.get_tracks(query, requester=requester, search_type=search_type)
+            return
+
+        pages = self.spotify_client.search_pages(query=query)
+        try:
+            try:
+                first_page = await pages.__anext__()
+            except Exception as _:
+                raise TrackLoadError("Not able to find the provided Spotify entity, is it private?")
+
+            yield await self._from_spotify(first_page, requester=requester, search_type=search_type)
+            async for page in pages:
+                yield await self._from_spotify(page, requester=requester, search_type=search_type)
+        finally:
+            await pages.aclose()
+
+    async def _from_spotify(
+        self,
+        results: Union[spotify.Track, spotify.Album, spotify.Artist, spotify.Playlist, List[spotify.Track]],
+        *,
+        requester: Member,
+        search_type: SearchType
+    ) -> Union[List[Track], Playlist]:
+        """Wraps Spotify results into voicelink tracks. A bare list of Spotify tracks stays a list."""
+        spotify_tracks = [results] if isinstance(results, spotify.Track) else results if isinstance(results, list) else results.tracks
+        tracks = [
+            Track(
+                track_id=None,
+                info=track.to_dict(),
+                requester=requester,
+                search_type=search_type,
+                spotify_track=track,
+            ) for track in spotify_tracks if track.uri or isinstance(results, spotify.Track)
+        ]
+        await self._attach_resolved(tracks, requester)
+
+        if isinstance(results, (spotify.Track, list)):
+            return tracks
+
+        return Playlist(
+            playlist_info={"name": results.name, "selectedTrack": 0},
+            tracks=tracks,
+            requester=requester,
+            spotify=True,
+            spotify_playlist=results
+        )
+
+    async def _attach_resolved(self, tracks: List[Track], requester: Member) -> None:
+        """Sets the playable track of Spotify tracks which were already resolved before."""
+        if not self._pool._spotify_cache:
+            return
+
+        resolved = await self._pool._spotify_cache.get_resolved(track.identifier for track in tracks)
+        for track in tracks:
+            if encoded := resolved.get(track.identifier):
+                track.original = LazyTrack(track_id=encoded, requester=requester)
+
     async def spotifySearch(self, query: str, *, requester: Member) -> Optional[List[Track]]:
         try:
             if not self.spotify_client:
@@ -506,7 +864,9 @@ class Node:
                 "please obtain Spotify API credentials here: https://developer.spotify.com/"
             )
                 
-            tracks = await self._spotify_client.trackSearch(query=query)
+            tracks = await self._inflight.run(
+                ("spotifySearch", query), lambda: self._spotify_client.trackSearch(query=query)
+            )
         except Exception as _:
             raise TrackLoadError("Not able to find the provided Spotify entity, is it private?")
             
@@ -520,12 +880,122 @@ class Node:
             )
             for track in tracks ]
 
+class NodeRebalancer:
+    """Moves players between nodes while they keep playing.
+       Every `interval` seconds players are moved from the most to the least loaded node
+       until their load scores are within `margin` of each other, at most `max_moves` per round.
+       `drain` empties a node, e.g. before restarting Lavalink. Migrations run concurrently
+       under a RateLimiter of `concurrency` at once and `per_second` starts per second.
+    """
+
+    def __init__(
+        self,
+        pool: NodePool,
+        *,
+        interval: float = 60.0,
+        margin: float = 20.0,
+        max_moves: int = 20,
+        concurrency: int = 5,
+        per_second: float = 5.0
+    ) -> None:
+        self._pool: NodePool = pool
+        self.interval: float = interval
+        self.margin: float = margin
+        self.max_moves: int = max_moves
+        self._limiter: RateLimiter = RateLimiter(concurrency, per_second)
+        self._task: Optional[asyncio.Task] = None
+
+        self.migrated: int = 0
+        self.failed: int = 0
+
+    async def _migrate(self, player: Player, node: Optional[Node] = None) -> bool:
+        async with self._limiter:
+            if player.node is node or player.guild.id not in player.node._players:
+                return False
+            try:
+                target = node or self._pool.get_best_node(algorithm=NodeAlgorithm.by_region, region=player._voice_region)
+            except NoNodesAvailable:
+                target = None
+
+            if target and target is not player.node and await player.migrate(target):
+                self.migrated += 1
+                return True
+
+            self.failed += 1
+            return False
+
+    async def migrate_players(self, players: List[Player], node: Optional[Node] = None) -> int:
+        """Migrates the players concurrently, to `node` or to the best node for each of them.
+           Returns how many players were moved.
+        """
+        results = await asyncio.gather(*(self._migrate(player, node) for player in players))
+        return sum(results)
+
+    async def drain(self, node: Node) -> int:
+        """Stops placing players on the node and moves its players away."""
+        node._draining = True
+        # Players that are playing go first, they are the ones people are listening to
+        players = sorted(node._players.values(), key=lambda player: not player.is_playing)
+        return await self.migrate_players(players)
+
+    def undrain(self, node: Node) -> None:
+        node._draining = False
+
+    async def rebalance(self) -> int:
+        nodes = [node for node in self._pool._nodes.values() if node._available and not node._draining]
+        if len(nodes) < 2:
+            return 0
+
+        # Only playing players count towards the load score, so only they can close the gap.
+        # Lavalink reports its own player count once a minute, so the scores of the round are
+        # projected by hand: every planned move shifts one player's share between the two nodes.
+        score = self._pool._load_score
+        expected = {node: score.score(node) for node in nodes}
+        candidates = {
+            node: sorted((player for player in node._players.values() if player.is_playing), key=lambda player: not player._paused)
+            for node in nodes
+        }
+
+        plan: List[Tuple[Player, Node]] = []
+        while len(plan) < self.max_moves:
+            busiest, idlest = max(nodes, key=expected.get), min(nodes, key=expected.get)
+            if expected[busiest] - expected[idlest] <= self.margin or not candidates[busiest]:
+                break
+
+            plan.append((candidates[busiest].pop(0), idlest))
+            expected[busiest] -= score.players
+            expected[idlest] += score.players
+
+        results = await asyncio.gather(*(self._migrate(player, node) for player, node in plan))
+        return sum(results)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.rebalance()
+            except Exception as e:
+                print(f"Failed to rebalance the nodes (Reason: {e})")
+
+    def start(self) -> None:
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
 class NodePool:
     """The base class for the node pool.
        This holds all the nodes that are to be used by the bot.
     """
 
     _nodes: Dict[str, Node] = {}
+    _track_cache: TrackCache = TrackCache()
+    _spotify_cache: Optional[spotify.SpotifyCache] = None
+    _load_score: LoadScore = LoadScore()
+    _rebalancer: Optional[NodeRebalancer] = None
 
     def __repr__(self):
         return f"<Voicelink.NodePool node_count={self.node_count}>"
@@ -535,12 +1005,67 @@ class NodePool:
         """Property which returns a dict with the node identifier and the Node object."""
         return self._nodes
 
+    @property
+    def track_cache(self) -> TrackCache:
+        """Property which returns the track cache shared by all nodes."""
+        return self._track_cache
+
+    @classmethod
+    def setup_track_cache(cls, **kwargs) -> TrackCache:
+        """Replaces the shared track cache, i.e. to apply the cache options from the settings file."""
+        cls._track_cache = TrackCache(**kwargs)
+        return cls._track_cache
+
+    @classmethod
+    def setup_spotify_cache(cls, path: Optional[str] = None, **kwargs) -> Optional[spotify.SpotifyCache]:
+        """Opens the persistent Spotify cache used by the Spotify clients of nodes created afterwards.
+           Passing no path disables it.
+        """
+        if cls._spotify_cache:
+            cls._spotify_cache.close()
+
+        cls._spotify_cache = spotify.SpotifyCache(path, **kwargs) if path else None
+        return cls._spotify_cache
+
+    @classmethod
+    def setup_load_score(cls, **weights) -> LoadScore:
+        """Replaces the weights used by NodeAlgorithm.by_load."""
+        cls._load_score = LoadScore(**weights)
+        return cls._load_score
+
+    @classmethod
+    def setup_rebalancer(cls, *, enabled: bool = True, **kwargs) -> NodeRebalancer:
+        """Creates the rebalancer used by drain_node, and starts the periodic rebalancing if enabled."""
+        if cls._rebalancer:
+            cls._rebalancer.stop()
+
+        cls._rebalancer = NodeRebalancer(cls, **kwargs)
+        if enabled:
+            cls._rebalancer.start()
+        return cls._rebalancer
+
+    @classmethod
+    async def drain_node(cls, identifier: str) -> int:
+        """Moves every player off a node and keeps new players away from it,
+           so the Lavalink server behind it can be restarted without interrupting playback.
+        """
+        if not (node := cls._nodes.get(identifier)):
+            raise NodeNotAvailable(f"The node '{identifier}' does not exist.")
+
+        rebalancer = cls._rebalancer or cls.setup_rebalancer(enabled=False)
+        return await rebalancer.drain(node)
+
+    @classmethod
+    def undrain_node(cls, identifier: str) -> None:
+        if node := cls._nodes.get(identifier):
+            node._draining = False
+
     @property
     def node_count(self) -> Optional[Node]:
         return len(self._nodes.values())
 
     @classmethod
-    def get_best_node(cls, *, algorithm: NodeAlgorithm) -> Node:
+    def get_best_node(cls, *, algorithm: NodeAlgorithm, region: Optional[str] = None) -> Node:
         """Fetches the best node based on an NodeAlgorithm.
          This option is preferred if you want to choose the best node
          from a multi-node setup using either the node's latency
@@ -549,12 +1074,15 @@ class NodePool:
          based on the node's latency.
          Use NodeAlgorithm.by_region if you want to get the best node
          based on the node's voice region. This method will only work
-         if you set a voice region when you create a node.
+         if you set a voice region when you create a node, otherwise
+         or without a region it falls back to NodeAlgorithm.by_load.
          Use NodeAlgorithm.by_players if you want to get the best node
          based on how players it has. This method will return a node with
          the least amount of players
+         Use NodeAlgorithm.by_load if you want to get the best node
+         based on the stats Lavalink reports, see LoadScore.
         """
-        available_nodes = [node for node in cls._nodes.values() if node._available]
+        available_nodes = [node for node in cls._nodes.values() if node._available and not node._draining]
 
         if not available_nodes:
             raise NoNodesAvailable("There are no nodes available.")
@@ -567,10 +1095,21 @@ class NodePool:
             tested_nodes = {node: len(node.players.keys()) for node in available_nodes}
             return min(tested_nodes, key=tested_nodes.get)
 
+        elif algorithm == NodeAlgorithm.by_load:
+            return min(available_nodes, key=cls._load_score.score)
+
+        elif algorithm == NodeAlgorithm.by_region:
+            if location := region_location(region):
+                distances = {node: node.distance_to(location) for node in available_nodes}
+                closest = min(distances.values())
+                if closest != float("inf"):
+                    available_nodes = [node for node, km in distances.items() if km <= closest + REGION_TOLERANCE_KM]
+            return min(available_nodes, key=cls._load_score.score)
+
     @classmethod
     def get_node(cls, *, identifier: str = None) -> Node:
         """Fetches a node from the node pool using it's identifier.
-           If no identifier is provided, it will choose a node at random.
+           If no identifier is provided, it will choose the least loaded node.
         """
 
         available_nodes = { node
@@ -579,12 +1118,13 @@ class NodePool:
 
         if identifier:
             available_nodes = { node for node in available_nodes if node._identifier == identifier }
+        else:
+            available_nodes = { node for node in available_nodes if not node._draining }
 
         if not available_nodes:
             raise NoNodesAvailable("There are no nodes available.")
 
-        nodes = {node: len(node.players.keys()) for node in available_nodes}
-        return min(nodes, key=nodes.get)
+        return min(available_nodes, key=cls._load_score.score)
 
     @classmethod
     async def create_node(
@@ -601,9 +1141,16 @@ class NodePool:
         spotify_client_secret: Optional[str] = None,
         session: Optional[aiohttp.ClientSession] = None,
         resume_key: Optional[str] = None,
+        resume_timeout: int = 60,
+        restore_concurrency: int = 5,
+        restore_rate: float = 10.0,
+        regions: Optional[List[str]] = None,
     ) -> Node:
         """Creates a Node object to be then added into the node pool.
            For Spotify searching capabilites, pass in valid Spotify API credentials.
+           Pass the voice regions (or airport codes) the node is close to for NodeAlgorithm.by_region.
+           Lavalink keeps the session playing for resume_timeout seconds after a disconnect (0 disables resuming),
+           otherwise players are restored restore_concurrency at a time.
         """
         if identifier in cls._nodes.keys():
             raise NodeCreationError(f"A node with identifier '{identifier}' already exists.")
@@ -612,7 +1159,8 @@ class NodePool:
             pool=cls, bot=bot, host=host, port=port, password=password,
             identifier=identifier, secure=secure, heartbeat=heartbeat, spotify_client_id=spotify_client_id, 
             session=session, spotify_client_secret=spotify_client_secret,
-            resume_key=resume_key
+            resume_key=resume_key, resume_timeout=resume_timeout, restore_concurrency=restore_concurrency,
+            restore_rate=restore_rate, regions=regions
         )
 
         await node.connect()
@@ -25,8 +25,10 @@ from .exceptions import QueueFull, OutofList
 from .objects import Track
 from .enums import LoopType
 
-from typing import Optional, Tuple, List, Callable
-from itertools import cycle
+from collections import deque, Counter
+from collections.abc import MutableSequence
+from typing import Optional, Tuple, List, Callable, Dict, Deque, Iterator, Iterable
+from itertools import cycle, chain
 from discord import Member
 
 class LoopTypeCycle:
@@ -52,16 +54,57 @@ class LoopTypeCycle:
         return self.current.name.capitalize()
 
 class Queue:
-    def __init__(self, size: int, allow_duplicate: bool, get_msg: Callable[[str], str]) -> None:
-        self._queue: List[Track] = []
+    def __init__(
+        self,
+        size: int,
+        allow_duplicate: bool,
+        get_msg: Callable[[str], str],
+        storage: Callable[[], MutableSequence] = list
+    ) -> None:
+        self._queue: MutableSequence[Track] = storage()
         self._position: int = 0
         self._size: int = size
         self._repeat: LoopTypeCycle = LoopTypeCycle()
         self._repeat_position: int = 0
         self._allow_duplicate: bool = allow_duplicate
+        self._uri_index: Optional[Counter] = None
 
+        self.version: int = 0
+        self.on_change: Optional[Callable[[], None]] = None
         self.get_msg = get_msg
 
+    def _changed(self) -> None:
+        """Marks the upcoming tracks as changed, i.e. added, removed or reordered."""
+        self.version += 1
+        if self.on_change:
+            self.on_change()
+
+    def _stored_tracks(self) -> Iterator[Track]:
+        return iter(self._queue)
+
+    def _uri_counts(self) -> Counter:
+        """Returns the uri -> count index of every stored track, building it on first use."""
+        if self._uri_index is None:
+            self._uri_index = Counter(track.uri for track in self._stored_tracks())
+        return self._uri_index
+
+    def _index_add(self, tracks: Iterable[Track]) -> None:
+        if self._uri_index is not None:
+            self._uri_index.update(track.uri for track in tracks)
+
+    def _index_remove(self, tracks: Iterable[Track]) -> None:
+        if self._uri_index is None:
+            return
+
+        for track in tracks:
+            if (count := self._uri_index[track.uri] - 1) > 0:
+                self._uri_index[track.uri] = count
+            else:
+                self._uri_index.pop(track.uri, None)
+
+    def is_duplicate(self, track: Track) -> bool:
+        return self._uri_counts()[track.uri] > 0
+
     def get(self) -> Optional[Track]:
         track = None
         try:
@@ -76,6 +119,7 @@ class Queue:
                 except IndexError:
                     self._repeat.set_mode(LoopType.off)
 
+        self._changed()
         return track
 
     def put(self, item: Track) -> int:
@@ -83,6 +127,8 @@ class Queue:
             raise QueueFull(self.get_msg("voicelinkQueueFull").format(self._size))
 
         self._queue.append(item)
+        self._index_add((item,))
+        self._changed()
         return self.count
 
     def put_at_front(self, item: Track) -> int:
@@ -90,44 +136,109 @@ class Queue:
             raise QueueFull(self.get_msg("voicelinkQueueFull").format(self._size))
 
         self._queue.insert(self._position, item)
+        self._index_add((item,))
+        self._changed()
         return 1
 
     def put_at_index(self, index: int, item: Track) -> None:
         if self.count >= self._size:
             raise QueueFull(self.get_msg("voicelinkQueueFull").format(self._size))
 
-        return self._queue.insert(self._position - 1 + index, item)
+        self._queue.insert(self._position - 1 + index, item)
+        self._index_add((item,))
+        self._changed()
+
+    def _insert_batch(self, tracks: List[Track], at_front: bool) -> None:
+        if at_front:
+            self._queue[self._position:self._position] = tracks
+        else:
+            self._queue.extend(tracks)
+        self._index_add(tracks)
+        self._changed()
+
+    def extend(self, tracks: Iterable[Track], *, at_front: bool = False, unique: bool = False) -> List[Track]:
+        """Adds many tracks in one operation and returns the tracks that were added.
+           If `unique` is set, tracks whose uri is already stored are skipped.
+           Tracks that do not fit are dropped; QueueFull is raised only if none fit.
+        """
+        space, is_full = self._size - self.count, False
+        index = self._uri_counts() if unique else None
+        added, seen = [], set()
+
+        for track in tracks:
+            if unique and (index[track.uri] or track.uri in seen):
+                continue
+            if len(added) >= space:
+                is_full = True
+                break
+
+            added.append(track)
+            if unique:
+                seen.add(track.uri)
+
+        if not added and is_full:
+            raise QueueFull(self.get_msg("voicelinkQueueFull").format(self._size))
+
+        if added:
+            self._insert_batch(added, at_front)
+        return added
+
+    def remove_at(self, position: int) -> Track:
+        """Removes the track stored at the absolute `position` and keeps the playing track in place."""
+        track = self.materialize(position).pop(position)
+        if position < self._position:
+            self._position -= 1
+
+        self._index_remove((track,))
+        self._changed()
+        return track
+
+    def materialize(self, until: int = None) -> MutableSequence[Track]:
+        """Returns the underlying track storage. Every position up to `until`
+           (or the whole queue if omitted) is guaranteed to be in it."""
+        return self._queue
 
     def skipto(self, index: int) -> None:
         if not 0 < index <= self.count:
             raise OutofList(self.get_msg("voicelinkOutofList"))
         else:
             self._position += index - 1
+            self._changed()
 
     def backto(self, index: int) -> None:
         if not self._position - index >= 0:
             raise OutofList(self.get_msg("voicelinkOutofList"))
         else:
             self._position -= index
+            self._changed()
 
     def history_clear(self, is_playing: bool) -> None:
-        self._queue[:self._position - 1 if is_playing else self._position] = []
+        end = self._position - 1 if is_playing else self._position
+        self._index_remove(self._queue[:end])
+        del self._queue[:end]
         self._position = 1 if is_playing else 0
 
     def clear(self) -> None:
+        self._index_remove(self._queue[self._position:])
         del self._queue[self._position:]
+        self._changed()
 
     def replace(self, queue_type: str, replacement: list) -> None:
         if queue_type == "queue":
             self.clear()
-            self._queue += replacement
+            self._queue.extend(replacement)
+            self._index_add(replacement)
         elif queue_type == "history":
+            self._index_remove(self._queue[:self._position])
             self._queue[:self._position] = replacement
+            self._index_add(replacement)
+        self._changed()
 
     def swap(self, num1: int, num2: int) -> Tuple[Track, Track]:
         try:
             pos = self._position - 1
             self._queue[pos + num1], self._queue[pos + num2] = self._queue[pos + num2], self._queue[pos + num1]
+            self._changed()
             return self._queue[pos + num1], self._queue[pos + num2]
         except IndexError:
             raise OutofList(self.get_msg("voicelinkOutofList"))
@@ -137,8 +248,8 @@ class Queue:
             raise OutofList(self.get_msg("voicelinkOutofList"))
 
         try:
-            moveItem = self._queue[self._position + target - 1]
-            self._queue.remove(moveItem)
+            moveItem = self._queue.pop(self._position + target - 1)
+            self._index_remove((moveItem,))
             self.put_at_index(to, moveItem)
             return moveItem
         except:
@@ -159,14 +270,22 @@ class Queue:
                 if member:
                     if track.requester != member:
                         continue
-            
-                self._queue.remove(track)
+
                 count.append({"position": pos + index + i, "track": track})
 
+            for removed in reversed(count):
+                del self._queue[removed["position"]]
+
+            self._index_remove(removed["track"] for removed in count)
+            self._changed()
             return count
         except:
             raise OutofList(self.get_msg("voicelinkOutofList"))
 
+    def peek(self, amount: int) -> List[Track]:
+        """Returns up to `amount` upcoming tracks without advancing the queue."""
+        return list(self._queue[self._position:self._position + amount])
+
     def history(self, incTrack: bool = False) -> List[Track]:
         if incTrack:
             return self._queue[:self._position]
@@ -179,7 +298,7 @@ class Queue:
 
     @property
     def count(self) -> int:
-        return len(self._queue[self._position:])
+        return max(len(self._queue) - self._position, 0)
     
     @property
     def repeat(self) -> str:
@@ -187,21 +306,21 @@ class Queue:
 
     @property
     def is_empty(self) -> bool:
-        try:
-            self._queue[self._position]
-        except:
-            return True
-        return False
+        return self.count == 0
 
 class FairQueue(Queue):
-    def __init__(self, size: int, allow_duplicate: bool, get_msg) -> None:
-        super().__init__(size, allow_duplicate, get_msg)
+    def __init__(self, size: int, allow_duplicate: bool, get_msg, storage: Callable[[], MutableSequence] = list) -> None:
+        super().__init__(size, allow_duplicate, get_msg, storage)
         self._set = set()
 
     def put(self, item: Track) -> int:
         if len(self._queue) >= self._size:
             raise QueueFull(self.get_msg("voicelinkQueueFull").format(self._size))
 
+        return self._place(item)
+
+    def _place(self, item: Track) -> int:
+        """Inserts the track after the last track of each other requester, without a capacity check."""
         tracks = self.tracks(incTrack=True)
         lastIndex = len(tracks)
         for track in reversed(tracks):
@@ -215,5 +334,131 @@ class FairQueue(Queue):
             lastIndex += 1
             self._set.add(track.requester)
 
-        self.put_at_index(lastIndex, item)
+        self._queue.insert(self._position - 1 + lastIndex, item)
+        self._index_add((item,))
+        self._changed()
         return lastIndex
+
+    def _insert_batch(self, tracks: List[Track], at_front: bool) -> None:
+        if at_front:
+            return super()._insert_batch(tracks, at_front)
+
+        # extend already sized the batch, so placing it can't fail halfway
+        for track in tracks:
+            self._place(track)
+
+
+class RoundRobinQueue(FairQueue):
+    """A fair queue which keeps a sub-queue for every requester.
+       New tracks are appended to their requester's bucket in O(1) and the buckets
+       are interleaved lazily, one track per requester in turn, only when a track
+       is played or a position in the merged queue is read or edited.
+    """
+
+    def __init__(self, size: int, allow_duplicate: bool, get_msg, storage: Callable[[], MutableSequence] = list) -> None:
+        super().__init__(size, allow_duplicate, get_msg, storage)
+        self._buckets: Dict[Optional[int], Deque[Track]] = {}
+        self._cursor: Deque[Optional[int]] = deque()
+        self._pending: int = 0
+
+    @staticmethod
+    def _requester_key(track: Track) -> Optional[int]:
+        return track.requester.id if track.requester else None
+
+    def _stored_tracks(self) -> Iterator[Track]:
+        return chain(self._queue, *self._buckets.values())
+
+    def _schedule(self, amount: int) -> None:
+        """Moves tracks from the buckets into the queue until `amount` upcoming tracks are scheduled."""
+        while self._pending and len(self._queue) - self._position < amount:
+            key = self._cursor[0]
+            bucket = self._buckets[key]
+            self._queue.append(bucket.popleft())
+            self._pending -= 1
+
+            if bucket:
+                self._cursor.rotate(-1)
+            else:
+                self._cursor.popleft()
+                del self._buckets[key]
+
+    def _iter_pending(self) -> Iterator[Track]:
+        buckets = [list(self._buckets[key]) for key in self._cursor]
+        for index in range(max((len(bucket) for bucket in buckets), default=0)):
+            for bucket in buckets:
+                if index < len(bucket):
+                    yield bucket[index]
+
+    def materialize(self, until: int = None) -> MutableSequence[Track]:
+        self._schedule(self._pending + self.count if until is None else until - self._position + 1)
+        return self._queue
+
+    def get(self) -> Optional[Track]:
+        self._schedule(1)
+        return super().get()
+
+    def put(self, item: Track) -> int:
+        if self.count >= self._size:
+            raise QueueFull(self.get_msg("voicelinkQueueFull").format(self._size))
+
+        return self._place(item)
+
+    def _place(self, item: Track) -> int:
+        key = self._requester_key(item)
+        if (bucket := self._buckets.get(key)) is None:
+            bucket = self._buckets[key] = deque()
+            self._cursor.append(key)
+
+        bucket.append(item)
+        self._pending += 1
+        self._index_add((item,))
+        self._changed()
+
+        rounds, position, passed = len(bucket) - 1, super().count + 1, False
+        for other in self._cursor:
+            other_size = len(self._buckets[other])
+            position += min(other_size, rounds)
+            if other == key:
+                passed = True
+            elif not passed and other_size > rounds:
+                position += 1
+
+        return position
+
+    def put_at_index(self, index: int, item: Track) -> None:
+        self._schedule(index)
+        return super().put_at_index(index, item)
+
+    def skipto(self, index: int) -> None:
+        self._schedule(index)
+        return super().skipto(index)
+
+    def clear(self) -> None:
+        super().clear()
+        self._index_remove(chain(*self._buckets.values()))
+        self._buckets.clear()
+        self._cursor.clear()
+        self._pending = 0
+
+    def swap(self, num1: int, num2: int) -> Tuple[Track, Track]:
+        self._schedule(max(num1, num2))
+        return super().swap(num1, num2)
+
+    def move(self, target: int, to: int) -> Optional[Track]:
+        self._schedule(max(target, to))
+        return super().move(target, to)
+
+    def remove(self, index: int, index2: int = None, member: Member = None) -> Optional[List[Track]]:
+        self._schedule(max(index, index2 or index))
+        return super().remove(index, index2, member)
+
+    def peek(self, amount: int) -> List[Track]:
+        self._schedule(amount)
+        return super().peek(amount)
+
+    def tracks(self, incTrack: bool = False) -> List[Track]:
+        return super().tracks(incTrack) + list(self._iter_pending())
+
+    @property
+    def count(self) -> int:
+        return super().count + self._pending
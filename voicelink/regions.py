@@ -0,0 +1,104 @@
+"""MIT License
+
+Copyright (c) 2023 - present BSG Development
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import math
+import re
+
+from typing import Dict, Optional, Tuple
+
+__all__ = [
+    "REGIONS",
+    "AIRPORTS",
+    "voice_region",
+    "region_location",
+    "distance"
+]
+
+# Approximate location of every Discord voice region
+REGIONS: Dict[str, Tuple[float, float]] = {
+    "us-east": (39.04, -77.49),
+    "us-central": (41.88, -87.63),
+    "us-south": (32.78, -96.80),
+    "us-west": (37.34, -121.89),
+    "brazil": (-23.55, -46.63),
+    "rotterdam": (51.92, 4.48),
+    "europe": (50.11, 8.68),
+    "russia": (55.76, 37.62),
+    "india": (19.08, 72.88),
+    "dubai": (25.20, 55.27),
+    "singapore": (1.35, 103.82),
+    "hongkong": (22.32, 114.17),
+    "japan": (35.68, 139.69),
+    "south-korea": (37.57, 126.98),
+    "sydney": (-33.87, 151.21),
+    "southafrica": (-26.20, 28.05)
+}
+
+# Newer voice endpoints are named after the nearest airport, e.g. c-iad03-1a2b3c4d.discord.media
+AIRPORTS: Dict[str, str] = {
+    "iad": "us-east", "ewr": "us-east", "jfk": "us-east", "bos": "us-east",
+    "ord": "us-central", "msp": "us-central",
+    "dfw": "us-south", "atl": "us-south", "mia": "us-south",
+    "sjc": "us-west", "lax": "us-west", "sea": "us-west", "sfo": "us-west",
+    "gru": "brazil", "scl": "brazil",
+    "ams": "rotterdam", "rtm": "rotterdam",
+    "fra": "europe", "lhr": "europe", "cdg": "europe", "mad": "europe", "mxp": "europe",
+    "waw": "europe", "arn": "europe", "hel": "europe", "vie": "europe",
+    "svo": "russia", "dme": "russia",
+    "bom": "india", "del": "india", "maa": "india",
+    "dxb": "dubai", "tlv": "dubai",
+    "sin": "singapore",
+    "hkg": "hongkong",
+    "nrt": "japan", "hnd": "japan", "kix": "japan",
+    "icn": "south-korea",
+    "syd": "sydney", "mel": "sydney",
+    "jnb": "southafrica", "cpt": "southafrica"
+}
+
+ENDPOINT_REGEX = re.compile(r"^(?:c-)?(?P<code>[a-z]+(?:-[a-z]+)*?)\d+")
+
+def voice_region(endpoint: Optional[str]) -> Optional[str]:
+    """Returns the voice region of a Discord voice endpoint, or None if it is unknown."""
+    if not endpoint:
+        return None
+
+    match = ENDPOINT_REGEX.match(endpoint.lower())
+    if not match:
+        return None
+
+    code = match.group("code")
+    region = AIRPORTS.get(code, code)
+    return region if region in REGIONS else None
+
+def region_location(region: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Accepts a region name or an airport code."""
+    if not region:
+        return None
+    region = region.lower()
+    return REGIONS.get(AIRPORTS.get(region, region))
+
+def distance(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """The great-circle distance between two locations in kilometers."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(h))
@@ -23,4 +23,5 @@ SOFTWARE.
 
 from .exceptions import InvalidSpotifyURL, SpotifyRequestException
 from .objects import *
+from .cache import SpotifyCache
 from .client import Client
@@ -0,0 +1,126 @@
+"""MIT License
+
+Copyright (c) 2022 BSG Development
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+from typing import Dict, Iterable, NamedTuple, Optional
+
+DEFAULT_TTLS: Dict[str, float] = {
+    "track": 7 * 24 * 60 * 60,
+    "album": 7 * 24 * 60 * 60,
+    "artist": 24 * 60 * 60,
+    "playlist": 10 * 60
+}
+
+class CachedEntity(NamedTuple):
+    data: dict
+    etag: Optional[str]
+    snapshot_id: Optional[str]
+    fresh: bool
+
+class SpotifyCache:
+    """A persistent SQLite cache for Spotify entity metadata and resolved tracks.
+       Entities are served without a request while they are fresh, and revalidated with
+       their snapshot id or ETag afterwards. Resolved tracks map a Spotify track id to
+       the encoded Lavalink track which was played for it.
+    """
+
+    def __init__(self, path: str, *, ttls: Optional[Dict[str, float]] = None) -> None:
+        self.path: str = path
+        self.ttls: Dict[str, float] = {**DEFAULT_TTLS, **(ttls or {})}
+
+        self._lock: threading.Lock = threading.Lock()
+        self._db: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entities ("
+                "type TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, etag TEXT, snapshot_id TEXT, "
+                "fetched_at REAL NOT NULL, PRIMARY KEY (type, id))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS resolved ("
+                "spotify_id TEXT PRIMARY KEY, encoded TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def __repr__(self) -> str:
+        return f"<Voicelink.spotify.SpotifyCache path={self.path!r}>"
+
+    def _execute(self, sql: str, params: Iterable = (), *, many: bool = False) -> list:
+        with self._lock, self._db:
+            cursor = self._db.executemany(sql, params) if many else self._db.execute(sql, params)
+            return cursor.fetchall()
+
+    async def _run(self, sql: str, params: Iterable = (), *, many: bool = False) -> list:
+        try:
+            return await asyncio.to_thread(self._execute, sql, params, many=many)
+        except sqlite3.Error:
+            return []
+
+    async def get_entity(self, spotify_type: str, spotify_id: str) -> Optional[CachedEntity]:
+        rows = await self._run(
+            "SELECT data, etag, snapshot_id, fetched_at FROM entities WHERE type = ? AND id = ?",
+            (spotify_type, spotify_id)
+        )
+        if not rows:
+            return None
+
+        data, etag, snapshot_id, fetched_at = rows[0]
+        fresh = time.time() - fetched_at < self.ttls.get(spotify_type, 0)
+        return CachedEntity(json.loads(data), etag, snapshot_id, fresh)
+
+    async def put_entity(self, spotify_type: str, spotify_id: str, data: dict, *, etag: Optional[str] = None) -> None:
+        await self._run(
+            "INSERT OR REPLACE INTO entities (type, id, data, etag, snapshot_id, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (spotify_type, spotify_id, json.dumps(data, separators=(",", ":")), etag, data.get("snapshot_id"), time.time())
+        )
+
+    async def touch_entity(self, spotify_type: str, spotify_id: str) -> None:
+        """Marks a cached entity as fresh again after it was revalidated."""
+        await self._run("UPDATE entities SET fetched_at = ? WHERE type = ? AND id = ?", (time.time(), spotify_type, spotify_id))
+
+    async def get_resolved(self, spotify_ids: Iterable[str]) -> Dict[str, str]:
+        """Returns the encoded Lavalink tracks known for the given Spotify track ids."""
+        spotify_ids = list(dict.fromkeys(spotify_ids))
+        resolved = {}
+        for index in range(0, len(spotify_ids), 500):
+            chunk = spotify_ids[index:index + 500]
+            rows = await self._run(
+                f"SELECT spotify_id, encoded FROM resolved WHERE spotify_id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            resolved.update(rows)
+        return resolved
+
+    async def put_resolved(self, spotify_id: str, encoded: str) -> None:
+        await self._run(
+            "INSERT OR REPLACE INTO resolved (spotify_id, encoded, updated_at) VALUES (?, ?, ?)",
+            (spotify_id, encoded, time.time())
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
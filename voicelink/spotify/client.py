@@ -23,15 +23,18 @@ SOFTWARE.
 
 import re
 import time
+import asyncio
 import aiohttp
 
 from base64 import b64encode
-from typing import List, Union
+from typing import AsyncIterator, List, Optional, Tuple, Union
+from .cache import CachedEntity, SpotifyCache
 from .objects import Track, Album, Artist, Playlist
 from .exceptions import InvalidSpotifyURL, SpotifyRequestException 
 
 GRANT_URL = "https://accounts.spotify.com/api/token"
 REQUEST_URL = "https://api.spotify.com/v1/{type}s/{id}"
+PLAYLIST_TRACKS_URL = "https://api.spotify.com/v1/playlists/{id}/tracks?offset={offset}&limit={limit}"
 SEARCH_URL = "https://api.spotify.com/v1/search?q={query}&type={type}&limit={limit}"
 SUGGESTION_URL = "https://api.spotify.com/v1/recommendations?limit={limit}&seed_tracks={seed_tracks}"
 SPOTIFY_URL_REGEX = re.compile(
@@ -44,9 +47,18 @@ class Client:
        for any Spotify URL you throw at it.
     """
 
-    def __init__(self, client_id: str, client_secret: str) -> None:
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        *,
+        cache: Optional[SpotifyCache] = None,
+        max_concurrency: int = 5
+    ) -> None:
         self._client_id = client_id
         self._client_secret = client_secret
+        self.cache: Optional[SpotifyCache] = cache
+        self.max_concurrency: int = max_concurrency
 
         self.session = aiohttp.ClientSession()
 
@@ -104,33 +116,48 @@ class Client:
             return [ Track(track) for track in data['tracks'] ]
             
     async def search(self, *, query: str) -> Union[Track, Album, Playlist]:
-        if not self._bearer_token or time.time() >= self._expiry:
-            await self._fetch_bearer_token()
-
         result = SPOTIFY_URL_REGEX.match(query)
+        if not result:
+            raise InvalidSpotifyURL("The Spotify link provided is not valid.")
+
         spotify_type = result.group("type")
-        spotify_id = result.group("id")
+        return self._build(spotify_type, await self._load_entity(spotify_type, result.group("id")))
 
+    async def search_pages(self, *, query: str) -> AsyncIterator[Union[Track, Album, Artist, Playlist, List[Track]]]:
+        """Like `search`, but an uncached playlist is yielded as soon as its first page is loaded,
+           followed by the tracks of each further page in order while the rest are still being fetched.
+        """
+        result = SPOTIFY_URL_REGEX.match(query)
         if not result:
             raise InvalidSpotifyURL("The Spotify link provided is not valid.")
 
-        request_url = REQUEST_URL.format(type=spotify_type, id=spotify_id)
-        if isArtist := (spotify_type == "artist"):
-            request_url += "/top-tracks?market=US"
+        spotify_type, spotify_id = result.group("type"), result.group("id")
+        if spotify_type != "playlist":
+            yield self._build(spotify_type, await self._load_entity(spotify_type, spotify_id))
+            return
 
-        async with self.session.get(request_url, headers=self._bearer_headers) as resp:
-            if resp.status != 200:
-                raise SpotifyRequestException(
-                    f"Error while fetching results: {resp.status} {resp.reason}"
-                )
+        data, _ = await self._cached_entity(spotify_type, spotify_id)
+        if data is not None:
+            yield self._build(spotify_type, data)
+            return
 
-            data: dict = await resp.json()
+        data, etag = await self._get(REQUEST_URL.format(type=spotify_type, id=spotify_id))
+        yield self._build(spotify_type, data)
 
+        async for items in self._iter_playlist_pages(spotify_id, data["tracks"]):
+            data["tracks"]["items"] += items
+            yield [Track(track["track"]) for track in items if track["track"] is not None]
+
+        data["tracks"]["next"] = None
+        if self.cache:
+            await self.cache.put_entity(spotify_type, spotify_id, data, etag=etag)
+
+    def _build(self, spotify_type: str, data: dict) -> Union[Track, Album, Artist, Playlist]:
         if spotify_type == "track":
             return Track(data)
         elif spotify_type == "album":
             return Album(data)
-        elif isArtist:
+        elif spotify_type == "artist":
             return Artist(data)
         else:
             tracks = [
@@ -140,25 +167,104 @@ class Client:
 
             if not tracks:
                 raise SpotifyRequestException("This playlist is empty and therefore cannot be queued.")
-                
-            next_page_url = data["tracks"]["next"]
 
-            while next_page_url is not None:
-                async with self.session.get(next_page_url, headers=self._bearer_headers) as resp:
-                    if resp.status != 200:
-                        raise SpotifyRequestException(
-                            f"Error while fetching results: {resp.status} {resp.reason}"
-                        )
+            return Playlist(data, tracks)
 
-                    next_data: dict = await resp.json()
+    async def _cached_entity(self, spotify_type: str, spotify_id: str) -> Tuple[Optional[dict], Optional[CachedEntity]]:
+        """Returns the cached data if it can be used without refetching, along with the cache entry."""
+        cached = await self.cache.get_entity(spotify_type, spotify_id) if self.cache else None
+        if not cached:
+            return None, None
 
-                tracks += [
-                    Track(track["track"])
-                    for track in next_data["items"] if track["track"] is not None
-                ]
-                next_page_url = next_data["next"]
+        if cached.fresh:
+            return cached.data, cached
+
+        if cached.snapshot_id and cached.snapshot_id == await self._fetch_snapshot_id(spotify_type, spotify_id):
+            await self.cache.touch_entity(spotify_type, spotify_id)
+            return cached.data, cached
+
+        return None, cached
+
+    async def _load_entity(self, spotify_type: str, spotify_id: str) -> dict:
+        """Returns the raw entity data, served from the cache while it is fresh or unchanged."""
+        data, cached = await self._cached_entity(spotify_type, spotify_id)
+        if data is not None:
+            return data
+
+        data, etag = await self._fetch_entity(spotify_type, spotify_id, etag=cached.etag if cached else None)
+        if data is None:
+            await self.cache.touch_entity(spotify_type, spotify_id)
+            return cached.data
+
+        if self.cache:
+            await self.cache.put_entity(spotify_type, spotify_id, data, etag=etag)
+        return data
+
+    async def _get(self, url: str, *, etag: Optional[str] = None) -> Tuple[Optional[dict], Optional[str]]:
+        if not self._bearer_token or time.time() >= self._expiry:
+            await self._fetch_bearer_token()
+
+        headers = {**self._bearer_headers, "If-None-Match": etag} if etag else self._bearer_headers
+        async with self.session.get(url, headers=headers) as resp:
+            if resp.status == 304:
+                return None, etag
+
+            if resp.status != 200:
+                raise SpotifyRequestException(
+                    f"Error while fetching results: {resp.status} {resp.reason}"
+                )
+
+            return await resp.json(), resp.headers.get("ETag")
+
+    async def _fetch_snapshot_id(self, spotify_type: str, spotify_id: str) -> Optional[str]:
+        if spotify_type != "playlist":
+            return None
+
+        data, _ = await self._get(REQUEST_URL.format(type=spotify_type, id=spotify_id) + "?fields=snapshot_id")
+        return data.get("snapshot_id")
+
+    async def _fetch_entity(self, spotify_type: str, spotify_id: str, *, etag: Optional[str] = None) -> Tuple[Optional[dict], Optional[str]]:
+        """Fetches an entity, following every page of a playlist. Returns no data if the ETag still matches."""
+        request_url = REQUEST_URL.format(type=spotify_type, id=spotify_id)
+        if spotify_type == "artist":
+            request_url += "/top-tracks?market=US"
+
+        data, etag = await self._get(request_url, etag=etag)
+        if data is None or spotify_type != "playlist":
+            return data, etag
+
+        async for items in self._iter_playlist_pages(spotify_id, data["tracks"]):
+            data["tracks"]["items"] += items
+
+        data["tracks"]["next"] = None
+        return data, etag
+
+    async def _iter_playlist_pages(self, spotify_id: str, first_page: dict) -> AsyncIterator[list]:
+        """Yields the items of every page after the first one, in order.
+           The page offsets are computed from the playlist total, so all pages are fetched concurrently.
+        """
+        if not first_page.get("next"):
+            return
+
+        limit = first_page.get("limit") or 100
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(offset: int) -> list:
+            async with semaphore:
+                data, _ = await self._get(PLAYLIST_TRACKS_URL.format(id=spotify_id, offset=offset, limit=limit))
+                return data["items"]
+
+        tasks = [
+            asyncio.ensure_future(fetch(offset))
+            for offset in range(first_page.get("offset", 0) + limit, first_page["total"], limit)
+        ]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-            return Playlist(data, tracks)
-    
     async def close(self) -> None:
         await self.session.close()
@@ -0,0 +1,355 @@
+"""MIT License
+
+Copyright (c) 2023 - present BSG Development
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import binascii
+
+from bisect import bisect_right
+from collections.abc import MutableSequence
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from .objects import Track, LazyTrack
+
+__all__ = [
+    "ChunkedList",
+    "CompactTrackList",
+    "STORAGE_ENGINES",
+    "get_storage"
+]
+
+class ChunkedList(MutableSequence):
+    """A list-like container which stores its items in a sequence of small chunks.
+       Positional inserts and deletes only shift the items of a single chunk, and
+       lookups bisect over the chunk offsets, so they stay sublinear on large queues.
+    """
+
+    def __init__(self, iterable: Iterable = (), *, load: int = 1024) -> None:
+        self._load: int = load
+        self._chunks: List[list] = []
+        self._offsets: List[int] = []
+        self._len: int = 0
+        self._dirty: int = 0
+
+        self.extend(iterable)
+
+    def __repr__(self) -> str:
+        return f"<Voicelink.ChunkedList len={self._len} chunks={len(self._chunks)}>"
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        return chain.from_iterable(self._chunks)
+
+    def __reversed__(self) -> Iterator:
+        for chunk in reversed(self._chunks):
+            yield from reversed(chunk)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (ChunkedList, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def _rebuild_offsets(self) -> None:
+        if self._dirty >= len(self._chunks):
+            return
+
+        offset = self._offsets[self._dirty - 1] + len(self._chunks[self._dirty - 1]) if self._dirty else 0
+        for index in range(self._dirty, len(self._chunks)):
+            self._offsets[index] = offset
+            offset += len(self._chunks[index])
+
+        self._dirty = len(self._chunks)
+
+    def _mark_dirty(self, chunk_index: int) -> None:
+        if chunk_index < self._dirty:
+            self._dirty = chunk_index
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        self._rebuild_offsets()
+        chunk_index = bisect_right(self._offsets, index) - 1
+        return chunk_index, index - self._offsets[chunk_index]
+
+    def _normalize(self, index: int) -> int:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("ChunkedList index out of range")
+        return index
+
+    def _slice_range(self, key: slice) -> Tuple[int, int, int]:
+        start, stop, step = key.indices(self._len)
+        if step == 1 and stop < start:
+            stop = start
+        return start, stop, step
+
+    def _iter_range(self, start: int, stop: int) -> Iterator:
+        if start >= stop:
+            return
+        chunk_index, offset = self._locate(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = self._chunks[chunk_index]
+            part = chunk[offset:offset + remaining]
+            yield from part
+            remaining -= len(part)
+            chunk_index, offset = chunk_index + 1, 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = self._slice_range(key)
+            if step == 1:
+                return list(self._iter_range(start, stop))
+            return [self[index] for index in range(start, stop, step)]
+
+        chunk_index, offset = self._locate(self._normalize(key))
+        return self._chunks[chunk_index][offset]
+
+    def __setitem__(self, key, value) -> None:
+        if isinstance(key, slice):
+            start, stop, step = self._slice_range(key)
+            values = list(value)
+            if step == 1:
+                del self[start:stop]
+                self._insert_many(start, values)
+                return
+
+            indices = range(start, stop, step)
+            if len(indices) != len(values):
+                raise ValueError(
+                    f"attempt to assign sequence of size {len(values)} to extended slice of size {len(indices)}"
+                )
+            for index, item in zip(indices, values):
+                self[index] = item
+            return
+
+        chunk_index, offset = self._locate(self._normalize(key))
+        self._chunks[chunk_index][offset] = value
+
+    def __delitem__(self, key) -> None:
+        if isinstance(key, slice):
+            start, stop, step = self._slice_range(key)
+            if step != 1:
+                for index in sorted(range(start, stop, step), reverse=True):
+                    del self[index]
+                return
+
+            while start < stop:
+                chunk_index, offset = self._locate(start)
+                chunk = self._chunks[chunk_index]
+                end = min(len(chunk), offset + stop - start)
+                del chunk[offset:end]
+                stop -= end - offset
+                self._len -= end - offset
+                self._drop_if_empty(chunk_index)
+            return
+
+        chunk_index, offset = self._locate(self._normalize(key))
+        del self._chunks[chunk_index][offset]
+        self._len -= 1
+        self._drop_if_empty(chunk_index)
+
+    def _drop_if_empty(self, chunk_index: int) -> None:
+        if self._chunks[chunk_index]:
+            self._mark_dirty(chunk_index + 1)
+            return
+
+        del self._chunks[chunk_index]
+        del self._offsets[chunk_index]
+        self._mark_dirty(chunk_index)
+
+    def _split(self, chunk_index: int) -> None:
+        chunk = self._chunks[chunk_index]
+        if len(chunk) <= self._load * 2:
+            return
+
+        half = len(chunk) // 2
+        self._chunks.insert(chunk_index + 1, chunk[half:])
+        self._offsets.insert(chunk_index + 1, 0)
+        del chunk[half:]
+
+    def insert(self, index: int, value: Any) -> None:
+        if index < 0:
+            index = max(0, index + self._len)
+
+        if index >= self._len:
+            return self.append(value)
+
+        chunk_index, offset = self._locate(index)
+        self._chunks[chunk_index].insert(offset, value)
+        self._len += 1
+        self._split(chunk_index)
+        self._mark_dirty(chunk_index + 1)
+
+    def _insert_many(self, index: int, values: list) -> None:
+        if not values:
+            return
+
+        if index >= self._len:
+            return self.extend(values)
+
+        chunk_index, offset = self._locate(index)
+        chunk = self._chunks[chunk_index]
+        tail = chunk[offset:]
+        del chunk[offset:]
+        chunk.extend(values[:self._load])
+
+        new_chunks = [values[i:i + self._load] for i in range(self._load, len(values), self._load)]
+        new_chunks.append(tail)
+        self._chunks[chunk_index + 1:chunk_index + 1] = new_chunks
+        self._offsets[chunk_index + 1:chunk_index + 1] = [0] * len(new_chunks)
+        self._len += len(values)
+        self._mark_dirty(chunk_index + 1)
+
+    def append(self, value: Any) -> None:
+        if not self._chunks or len(self._chunks[-1]) >= self._load:
+            self._offsets.append(self._len)
+            self._chunks.append([])
+            if self._dirty == len(self._chunks) - 1:
+                self._dirty += 1
+
+        self._chunks[-1].append(value)
+        self._len += 1
+
+    def extend(self, values: Iterable) -> None:
+        if values is self:
+            values = list(values)
+
+        values = iter(values)
+        while True:
+            if not self._chunks or len(self._chunks[-1]) >= self._load:
+                batch = list(islice(values, self._load))
+                if not batch:
+                    break
+                self._offsets.append(self._len)
+                self._chunks.append(batch)
+                if self._dirty == len(self._chunks) - 1:
+                    self._dirty += 1
+            else:
+                chunk = self._chunks[-1]
+                batch = list(islice(values, self._load - len(chunk)))
+                if not batch:
+                    break
+                chunk.extend(batch)
+            self._len += len(batch)
+
+    def index(self, value: Any, start: int = 0, stop: int = None) -> int:
+        start, stop, _ = self._slice_range(slice(start, stop))
+        for index, item in enumerate(self._iter_range(start, stop), start=start):
+            if item is value or item == value:
+                return index
+        raise ValueError(f"{value!r} is not in ChunkedList")
+
+    def clear(self) -> None:
+        self._chunks.clear()
+        self._offsets.clear()
+        self._len = 0
+        self._dirty = 0
+
+class CompactTrackList(MutableSequence):
+    """A track container which keeps plain Lavalink tracks as raw encoded bytes in a column,
+       next to a column of requesters. Reading an item materializes a LazyTrack view of it.
+       Spotify and stream tracks carry state the encoded form can't hold, so they are kept as objects.
+    """
+
+    def __init__(self, iterable: Iterable = ()) -> None:
+        self._blobs: list = []
+        self._requesters: list = []
+
+        self.extend(iterable)
+
+    def __repr__(self) -> str:
+        return f"<Voicelink.CompactTrackList len={len(self._blobs)}>"
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def __iter__(self) -> Iterator:
+        return map(self._unpack, self._blobs, self._requesters)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (MutableSequence, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    @staticmethod
+    def _pack(track: Track) -> Tuple[Any, Any]:
+        if (isinstance(track, LazyTrack) and not track.is_loaded) or not (track.spotify or track.is_stream):
+            return binascii.a2b_base64(track.track_id), track.requester
+        return track, None
+
+    @staticmethod
+    def _unpack(blob, requester) -> Track:
+        if isinstance(blob, Track):
+            return blob
+        return LazyTrack(track_id=binascii.b2a_base64(blob, newline=False).decode("ascii"), requester=requester)
+
+    def _pack_many(self, values: Iterable) -> Tuple[list, list]:
+        packed = [self._pack(track) for track in values]
+        return [blob for blob, _ in packed], [requester for _, requester in packed]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return list(map(self._unpack, self._blobs[key], self._requesters[key]))
+        return self._unpack(self._blobs[key], self._requesters[key])
+
+    def __setitem__(self, key, value) -> None:
+        if isinstance(key, slice):
+            blobs, requesters = self._pack_many(value)
+            self._blobs[key] = blobs
+            self._requesters[key] = requesters
+            return
+        self._blobs[key], self._requesters[key] = self._pack(value)
+
+    def __delitem__(self, key) -> None:
+        del self._blobs[key]
+        del self._requesters[key]
+
+    def insert(self, index: int, value: Track) -> None:
+        blob, requester = self._pack(value)
+        self._blobs.insert(index, blob)
+        self._requesters.insert(index, requester)
+
+    def append(self, value: Track) -> None:
+        blob, requester = self._pack(value)
+        self._blobs.append(blob)
+        self._requesters.append(requester)
+
+    def extend(self, values: Iterable) -> None:
+        blobs, requesters = self._pack_many(list(values))
+        self._blobs.extend(blobs)
+        self._requesters.extend(requesters)
+
+    def clear(self) -> None:
+        self._blobs.clear()
+        self._requesters.clear()
+
+STORAGE_ENGINES: Dict[str, Callable[[], MutableSequence]] = {
+    "list": list,
+    "chunked": ChunkedList,
+    "compact": CompactTrackList
+}
+
+def get_storage(name: str) -> Callable[[], MutableSequence]:
+    """Returns the storage engine registered under the given name, defaulting to a plain list."""
+    return STORAGE_ENGINES.get(name.lower() if name else "list", list)
@@ -21,15 +21,19 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import asyncio
 import random
 import time
-import socket
-from timeit import default_timer as timer
-from itertools import zip_longest
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, Union
 
 __all__ = [
     "ExponentialBackoff",
-    "NodeStats"
+    "NodeStats",
+    "SingleFlight",
+    "LatencyStats",
+    "ProbeStats",
+    "RateLimiter"
 ]
 
 class ExponentialBackoff:
@@ -80,6 +84,147 @@ class ExponentialBackoff:
         return self._randfunc(0, self._base * 2 ** self._exp)
 
 
+class SingleFlight:
+    """Runs at most one call per key at a time.
+       Callers that ask for a key which is already in flight await the same result
+       instead of starting their own request. The call runs as its own task, so a
+       cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced: int = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        if task := self._calls.get(key):
+            self.coalesced += 1
+        else:
+            task = self._calls[key] = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+
+class LatencyStats:
+    """Keeps the most recent latency samples, in milliseconds, and summarizes them."""
+
+    def __init__(self, size: int = 500) -> None:
+        self._samples: deque = deque(maxlen=size)
+        self.count: int = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+
+    def percentile(self, percent: float) -> float:
+        if not self._samples:
+            return 0.0
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+    @property
+    def summary(self) -> Dict[str, Union[int, float]]:
+        samples = self._samples
+        return {
+            "count": self.count,
+            "avg": round(sum(samples) / len(samples), 2) if samples else 0.0,
+            "p50": round(self.percentile(50), 2),
+            "p95": round(self.percentile(95), 2),
+            "max": round(max(samples), 2) if samples else 0.0
+        }
+
+
+class RateLimiter:
+    """Limits how many operations run at once and how many may start per second.
+       Use it as an async context manager around every operation.
+    """
+
+    def __init__(self, concurrency: int = 5, per_second: float = 10.0) -> None:
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        self._interval: float = 1 / per_second if per_second else 0.0
+        self._next_start: float = 0.0
+
+    async def __aenter__(self) -> None:
+        await self._semaphore.acquire()
+        now = time.monotonic()
+        start, self._next_start = max(now, self._next_start), max(now, self._next_start) + self._interval
+        if start > now:
+            try:
+                await asyncio.sleep(start - now)
+            except BaseException:
+                self._semaphore.release()
+                raise
+
+    async def __aexit__(self, *args) -> None:
+        self._semaphore.release()
+
+
+class ProbeStats:
+    """Round trip times measured by the background prober of a node.
+       Keeps an exponentially weighted moving average next to a sample history
+       for both the TCP connect time and the REST round trip, all in milliseconds.
+    """
+
+    def __init__(self, alpha: float = 0.3, size: int = 100) -> None:
+        self.alpha: float = alpha
+        self.tcp: LatencyStats = LatencyStats(size)
+        self.rest: LatencyStats = LatencyStats(size)
+        self.tcp_ewma: float = None
+        self.rest_ewma: float = None
+
+        self.failures: int = 0
+        self.consecutive_failures: int = 0
+        self.last_probe: float = None
+
+    def _ewma(self, current: float, value: float) -> float:
+        return value if current is None else self.alpha * value + (1 - self.alpha) * current
+
+    def add(self, tcp: float = None, rest: float = None) -> None:
+        if tcp is not None:
+            self.tcp.add(tcp)
+            self.tcp_ewma = self._ewma(self.tcp_ewma, tcp)
+        if rest is not None:
+            self.rest.add(rest)
+            self.rest_ewma = self._ewma(self.rest_ewma, rest)
+
+        self.consecutive_failures = 0
+        self.last_probe = time.monotonic()
+
+    def fail(self) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_probe = time.monotonic()
+
+    @property
+    def latency(self) -> float:
+        """The smoothed TCP connect time, or infinity while the node has not been reached yet."""
+        if self.consecutive_failures or self.tcp_ewma is None:
+            return float("inf")
+        return self.tcp_ewma
+
+    @property
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "tcp_ewma": round(self.tcp_ewma, 2) if self.tcp_ewma is not None else None,
+            "rest_ewma": round(self.rest_ewma, 2) if self.rest_ewma is not None else None,
+            "tcp": self.tcp.summary,
+            "rest": self.rest.summary,
+            "failures": self.failures
+        }
+
+
 class NodeStats:
     """The base class for the node stats object.
        Gives critical information on the node, which is updated every minute.
@@ -102,70 +247,11 @@ class NodeStats:
         self.players_total = data.get("players")
         self.uptime = data.get("uptime")
 
+        # Average frames per player in the last minute, only sent while players are playing
+        frames: dict = data.get("frameStats") or {}
+        self.frames_sent = frames.get("sent", 0)
+        self.frames_nulled = frames.get("nulled", 0)
+        self.frames_deficit = frames.get("deficit", 0)
+
     def __repr__(self) -> str:
         return f"<Voicelink.NodeStats total_players={self.players_total!r} playing_active={self.players_active!r}>"
-
-
-class Ping:
-    # Thanks to https://github.com/zhengxiaowai/tcping for the nice ping impl
-    def __init__(self, host, port, timeout=5):
-        self.timer = self.Timer()
-
-        self._successed = 0
-        self._failed = 0
-        self._conn_time = None
-        self._host = host
-        self._port = port
-        self._timeout = timeout
-
-    class Socket(object):
-        def __init__(self, family, type_, timeout):
-            s = socket.socket(family, type_)
-            s.settimeout(timeout)
-            self._s = s
-
-        def connect(self, host, port):
-            self._s.connect((host, int(port)))
-
-        def shutdown(self):
-            self._s.shutdown(socket.SHUT_RD)
-
-        def close(self):
-            self._s.close()
-
-
-    class Timer(object):
-        def __init__(self):
-            self._start = 0
-            self._stop = 0
-
-        def start(self):
-            self._start = timer()
-
-        def stop(self):
-            self._stop = timer()
-
-        def cost(self, funcs, args):
-            self.start()
-            for func, arg in zip_longest(funcs, args):
-                if arg:
-                    func(*arg)
-                else:
-                    func()
-
-            self.stop()
-            return self._stop - self._start
-
-    def _create_socket(self, family, type_):
-        return self.Socket(family, type_, self._timeout)
-
-    def get_ping(self):
-        s = self._create_socket(socket.AF_INET, socket.SOCK_STREAM)
-     
-        cost_time = self.timer.cost(
-            (s.connect, s.shutdown),
-            ((self._host, self._port), None))
-        s_runtime = 1000 * (cost_time)
-
-        return s_runtime
-
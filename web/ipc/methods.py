@@ -2,7 +2,7 @@ import json, function as func
 
 from discord import Member, VoiceChannel
 from discord.ext import commands
-from voicelink import Player, Track, Playlist, NodePool, connect_channel, decode, LoopType
+from voicelink import Player, LazyTrack, Playlist, NodePool, connect_channel, LoopType, decode
 
 class TempCtx():
     def __init__(self, author: Member, channel: VoiceChannel) -> None:
@@ -48,7 +48,7 @@ async def initPlayer(player: Player, member: Member, data: dict):
             "avatar_url": member.display_avatar.url,
             "name": member.name
         } for member in player.channel.members ],
-        "tracks": [ track.track_id for track in player.queue._queue ],
+        "tracks": [ track.track_id for track in player.queue.history(incTrack=True) + player.queue.tracks() ],
         "repeat_mode": player.queue.repeat.lower(),
         "channel_name": player.channel.name,
         "current_queue_position": player.queue._position if player._current else player.queue._position + 1,
@@ -111,9 +111,14 @@ async def moveTrack(player: Player, member: Member, data: dict):
     position = data.get("position")
     new_position = data.get("newPosition")
 
-    moveItem = player.queue._queue[position]
-    player.queue._queue.remove(moveItem)
-    player.queue._queue.insert(new_position, moveItem)
+    if position > c and new_position > c:
+        # Reordering upcoming tracks goes through the queue, which keeps its index and prefetch up to date
+        moveItem = player.queue.move(position - c, new_position - c)
+    else:
+        queue = player.queue.materialize(max(position, new_position))
+        moveItem = queue.pop(position)
+        queue.insert(new_position, moveItem)
+        player.queue._changed()
     
     if position > c and new_position <= c:
         player.queue._position += 1
@@ -140,11 +145,7 @@ async def moveTrack(player: Player, member: Member, data: dict):
 
 async def addTracks(player: Player, member: Member, data: dict): 
     raw_tracks = data.get("tracks", [])
-    tracks = [Track(
-                track_id=track_id, 
-                info=decode(track_id),
-                requester=member
-            ) for track_id in raw_tracks]
+    tracks = [LazyTrack(track_id=track_id, requester=member) for track_id in raw_tracks]
 
     await player.add_track(tracks)
 
@@ -193,12 +194,9 @@ async def removeTrack(player: Player, member: Member, data: dict):
     position = data.get("position")
     verify_id = data.get("track_id")
 
-    track = player.queue._queue[position]
+    track = player.queue.materialize(position)[position]
     if track.track_id == verify_id:
-        player.queue._queue.remove(track)
-
-    if position < player.queue._position:
-         player.queue._position -= 1
+        player.queue.remove_at(position)
 
     return {
         "op": "removeTrack", 
@@ -271,7 +269,10 @@ async def getPlaylists(member: Member, data: dict):
 
     for pId, pList in playlists.copy().items():
         if "type" in pList:
-            if pList["type"] == "link":
+            if pList["type"] not in ("link", "share"):
+                playlists[pId]["tracks"] = await func.get_playlist_tracks(member.id, pId)
+
+            elif pList["type"] == "link":
                 tracks: Playlist = await NodePool.get_node().get_tracks(pList["uri"], requester=member)
                 if tracks:
                     playlists[pId]["tracks"] = [ track.track_id for track in tracks.tracks ]
@@ -289,7 +290,7 @@ async def getPlaylists(member: Member, data: dict):
                         tracks: Playlist = await NodePool.get_node().get_tracks(playlist["uri"], requester=member)
                         playlists[pId]["tracks"] = [ track.track_id for track in tracks.tracks ]
                     else:
-                        playlists[pId]["tracks"] = playlist["tracks"]
+                        playlists[pId]["tracks"] = await func.get_playlist_tracks(pList["user"], pList["referId"])
             
     return {
         "op": "getPlaylists",
@@ -308,7 +309,7 @@ async def removePlaylist(member: Member, data:dict):
         refer_user = data.get("refer_user")
         await func.update_user(refer_user, {"$pull": {f"playlist.{pId}.perms.read": member.id}})
 
-    await func.update_user(member.id, {"$unset": {f'playlist.{pId}': 1}})
+    await func.delete_playlist(member.id, pId)
 
 async def addPlaylistTrack(member: Member, data: dict):
     track_id = data.get("track_id")
@@ -316,7 +317,7 @@ async def addPlaylistTrack(member: Member, data: dict):
     if not track_id or not pId:
         return
     
-    playlist: dict = await func.get_user(member.id, 'playlist')
+    playlist: dict = await func.get_user(member.id, 'playlist', view=True)
     playlist = playlist.get(pId)
     if not playlist:
         return
@@ -325,13 +326,14 @@ async def addPlaylistTrack(member: Member, data: dict):
         return error_msg(func.get_lang(member.guild.id, 'playlistNotAllow'), user_id=member.id)
     
     rank, max_p, max_t = func.check_roles()
-    if len(playlist["tracks"]) >= max_t:
+    count, _ = await func.get_playlist_stats(member.id, pId)
+    if count >= max_t:
         return error_msg(func.get_lang(member.guild.id, "playlistlimited").format(max_t), user_id=member.id)
 
-    if track_id in playlist['tracks']:
+    if await func.playlist_contains(member.id, pId, track_id):
         return error_msg(func.get_lang(member.guild.id, "playlistrepeated"), user_id=member.id)
     
-    await func.update_user(member.id, {"$push": {f'playlist.{pId}.tracks': track_id}})
+    await func.add_playlist_tracks(member.id, pId, [track_id], [decode(track_id).get("length", 0)])
 
 async def removePlaylistTrack(member: Member, data: dict):
     track_id = data.get("track_id")
@@ -339,7 +341,7 @@ async def removePlaylistTrack(member: Member, data: dict):
     if not track_id or not pId:
         return
     
-    await func.update_user(member.id, {"$pull": {f'playlist.{pId}.tracks': track_id }})
+    await func.remove_playlist_track(member.id, pId, track_id=track_id)
 
 methods = {
     "initPlayer": [initPlayer, False],